@@ -1,76 +1,180 @@
 import discord
 from discord.ext import commands, tasks
 from discord import app_commands
-import aiohttp
 import asyncio
+import copy
+import functools
+import hashlib
+import json
 import logging
+import os
+import random
 import re
-import json
+import time
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+from utils.config_store import config_store
+from utils.fanout import fan_out
+from utils.status_history import StatusHistory
 
 logger = logging.getLogger(__name__)
 
-async def load_config():
-    """Load configuration from config.json"""
-    try:
-        with open('config.json', 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {}
-    except Exception as e:
-        logger.error(f"Error loading config: {e}")
-        return {}
+# Seconds a fetched status is reused by slash commands before asking status.cfx.re again
+STATUS_CACHE_TTL = float(os.getenv('FIVEM_STATUS_CACHE_TTL', '60'))
+
+# Unchanged status messages are still re-edited this often so their timestamp stays fresh
+HEARTBEAT_INTERVAL = 60 * 60
+
+# Status message edits running at once, and the maximum time a whole broadcast may take
+FANOUT_CONCURRENCY = 10
+FANOUT_TIMEOUT = 120
+
+# Monitor polling interval (seconds): normal, after STABLE_AFTER seconds without changes,
+# and while any service is not operational. Upstream errors double it up to POLL_MAX_BACKOFF.
+POLL_INTERVAL = 5 * 60
+POLL_STABLE_INTERVAL = 15 * 60
+POLL_INCIDENT_INTERVAL = 45
+POLL_MAX_BACKOFF = 30 * 60
+POLL_JITTER = 0.1
+STABLE_AFTER = 6 * 60 * 60
+
+# Known non-operational statuses; ❓ (component not found or not parsed) is never an incident
+INCIDENT_PREFIXES = ("🟡", "🟠", "🔴", "🔧")
+
+# A status change must last this many seconds before it is alerted, so flapping services stay quiet
+ALERT_DEBOUNCE = 2 * 60
+
+# Status transitions kept in memory, where they are saved and how often
+HISTORY_CAPACITY = 4096
+HISTORY_PATH = os.getenv('FIVEM_HISTORY_PATH', 'fivem_history.json')
+HISTORY_FLUSH_INTERVAL = 10 * 60
+
+
+def normalize_component_name(name: str) -> str:
+    return name.strip().strip('"').lower()
 
-async def save_config(config):
-    """Save configuration to config.json"""
-    try:
-        with open('config.json', 'w') as f:
-            json.dump(config, f, indent=2)
-        return True
-    except Exception as e:
-        logger.error(f"Error saving config: {e}")
-        return False
+# (display name, Statuspage component name, precompiled HTML fallback pattern)
+_SERVICE_DEFINITIONS = (
+    ("🎮 FiveM", "FiveM", r"FiveM"),
+    ("🤠 RedM", "RedM", r"RedM"),
+    ("🖥️ FXServer", "Cfx.re Platform Server (FXServer)", r"Cfx\.re Platform Server \(FXServer\)"),
+    ("🎯 Game Services", "Game Services", r"Game Services"),
+    ("🔗 CnL", "CnL", r"CnL"),
+    ("📋 Policy", "Policy", r"Policy"),
+    ("🔑 Keymaster", "Keymaster", r"Keymaster"),
+    ("🌐 Web Services", "Web Services", r"Web Services"),
+    ("💬 Forums", "Forums", r"Forums"),
+    ("📋 Server List", "Server List Frontend", r"Server List Frontend"),
+    ("⚡ Runtime", "Runtime", r"\"Runtime\""),
+    ("🆔 IDMS", "IDMS", r"IDMS"),
+    ("🚪 Portal", "Portal", r"Portal"),
+)
+
+SERVICES = tuple(
+    (
+        display_name,
+        normalize_component_name(component_name),
+        re.compile(
+            rf"{pattern}.*?(Operational|Degraded Performance|Partial Outage|Major Outage|Maintenance)",
+            re.IGNORECASE | re.DOTALL
+        )
+    )
+    for display_name, component_name, pattern in _SERVICE_DEFINITIONS
+)
+
+# Embed fields and the services listed in each, in display order
+SERVICE_GROUPS = (
+    ("🎮 **Servicios de Juego**", ("🎮 FiveM", "🤠 RedM", "🖥️ FXServer", "🎯 Game Services")),
+    ("🛠️ **Servicios de Plataforma**", ("🔗 CnL", "📋 Policy", "🔑 Keymaster", "🌐 Web Services")),
+    ("👥 **Servicios de Comunidad**", ("💬 Forums", "📋 Server List", "⚡ Runtime", "🆔 IDMS", "🚪 Portal")),
+)
+
+# Statuspage component status -> display text
+COMPONENT_STATUS = {
+    "operational": "🟢 Operativo",
+    "degraded_performance": "🟡 Rendimiento Degradado",
+    "partial_outage": "🟠 Falla Parcial",
+    "major_outage": "🔴 Falla Mayor",
+    "under_maintenance": "🔧 Mantenimiento",
+}
+
+# Status text found in the HTML page -> display text
+HTML_STATUS = {
+    "operational": "🟢 Operativo",
+    "degraded performance": "🟡 Rendimiento Degradado",
+    "partial outage": "🟠 Falla Parcial",
+    "major outage": "🔴 Falla Mayor",
+    "maintenance": "🔧 Mantenimiento",
+}
+
+# Statuspage page indicator -> overall display text
+OVERALL_STATUS = {
+    "none": "🟢 Todos los sistemas operativos",
+    "minor": "🟡 Algunos sistemas con problemas",
+    "major": "🔴 Falla mayor del servicio",
+    "critical": "🔴 Falla mayor del servicio",
+    "maintenance": "🔧 Mantenimiento en curso",
+}
+
+class StatusSnapshot:
+    """Parsed status plus the validators used for conditional requests"""
+
+    def __init__(self, data: Dict[str, str], etag: Optional[str], last_modified: Optional[str],
+                 version: int, source: str):
+        self.data = data
+        self.etag = etag
+        self.last_modified = last_modified
+        self.source = source  # 'json' (Statuspage API) or 'html'
+        self.version = version  # increases every time the parsed status changes
+        self.fetched_at = time.monotonic()
+        self.stale = False  # the last refresh failed, data is from fetched_at
+
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
 
 class FiveMStatus(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.status_url = "https://status.cfx.re"
+        self.api_url = f"{self.status_url}/api/v2/summary.json"
         self.server_monitors = {}  # guild_id -> {channel_id, message_id}
         self.last_status = {}
-        self.config_loaded = False
+        self.snapshot: Optional[StatusSnapshot] = None
+        self.last_failure: Optional[float] = None  # monotonic time of the last failed refresh
+        self._fetch_task: Optional[asyncio.Task] = None
+        self._rendered: Optional[Tuple[int, dict, str]] = None  # (snapshot version, embed payload, hash)
+        self.poll_failures = 0
+        self.alerted_status: Dict[str, str] = {}  # service -> last status announced in alerts
+        self.pending_alerts: Dict[str, Tuple[str, float]] = {}  # service -> (new status, first seen)
+        self.history = StatusHistory([service[0] for service in SERVICES], HISTORY_CAPACITY, HISTORY_PATH)
         
+    def load_monitors_from_config(self):
+        """Register the status message of every configured guild.
+
+        No API calls are made here; a message that no longer exists is
+        detected (and forgotten) the first time the monitor edits it.
+        """
+        for guild_id, server_config in config_store.guilds():
+            channel_id = server_config.get('fivem_status_channel_id')
+            message_id = server_config.get('fivem_status_message_id')
+            
+            if channel_id and message_id:
+                self.server_monitors[guild_id] = {
+                    'channel_id': channel_id,
+                    'message_id': message_id
+                }
+        logger.info(f"Loaded FiveM monitors for {len(self.server_monitors)} guild(s)")
+
+    def invalidate_monitor(self, guild_id: int):
+        """Forget a monitor whose status message was deleted"""
+        self.server_monitors.pop(guild_id, None)
+        if config_store.has_guild(guild_id):
+            config_store.set(guild_id, 'fivem_status_message_id', None)
+
     async def setup_monitor_from_config(self):
         """Load monitor configuration from config file"""
         try:
-            config = await load_config()
-            if 'servers' in config:
-                for guild_id_str, server_config in config['servers'].items():
-                    guild_id = int(guild_id_str)
-                    channel_id = server_config.get('fivem_status_channel_id')
-                    message_id = server_config.get('fivem_status_message_id')
-                    
-                    if channel_id and message_id:
-                        # Verificar que el canal y mensaje existen
-                        try:
-                            channel = self.bot.get_channel(channel_id)
-                            if channel:
-                                await channel.fetch_message(message_id)
-                                self.server_monitors[guild_id] = {
-                                    'channel_id': channel_id,
-                                    'message_id': message_id
-                                }
-                                logger.info(f"Loaded FiveM monitor for guild {guild_id}: channel={channel_id}, message={message_id}")
-                            else:
-                                logger.warning(f"FiveM status channel not found for guild {guild_id}, skipping")
-                        except discord.NotFound:
-                            logger.warning(f"FiveM status message not found for guild {guild_id}, clearing message ID")
-                            # Limpiar mensaje ID inválido
-                            config['servers'][guild_id_str]['fivem_status_message_id'] = None
-                            await save_config(config)
-                        except Exception as e:
-                            logger.error(f"Error validating FiveM status message for guild {guild_id}: {e}")
-                        
+            self.load_monitors_from_config()
         except Exception as e:
             logger.error(f"Error loading FiveM monitor config: {e}")
         
@@ -80,68 +184,140 @@ class FiveMStatus(commands.Cog):
         
     async def cog_load(self):
         """Called when the cog is loaded"""
+        await self.load_history()
         await self.setup_monitor_from_config()
     
+    async def load_history(self):
+        """Restore the status history and the statuses last announced in alerts"""
+        await asyncio.to_thread(self.history.load)
+        # Saved with the history, so a change that happened while offline (or was
+        # still debouncing at shutdown) is alerted after the restart
+        self.alerted_status = self.history.extra.setdefault('alerted_status', {})
+    
     async def cog_unload(self):
         """Called when the cog is unloaded"""
         self.status_monitor.cancel()
+        await self.history.flush()
     
-    async def fetch_fivem_status(self) -> Dict[str, str]:
-        """Fetch the current FiveM service status"""
+    async def fetch_fivem_status(self, max_age: float = STATUS_CACHE_TTL, allow_stale: bool = True) -> Dict[str, str]:
+        """Return the current FiveM service status.
+
+        A snapshot younger than max_age seconds is returned without a request,
+        and a failed refresh is not retried for max_age seconds either.
+        Concurrent callers share a single in-flight request. When status.cfx.re
+        can't be reached the last snapshot is returned (with snapshot.stale
+        set) if allow_stale, otherwise an empty dict.
+        """
+        snapshot = self.snapshot
+        if snapshot and not snapshot.stale and snapshot.age() < max_age:
+            return snapshot.data
+        
+        if self.last_failure is None or time.monotonic() - self.last_failure >= max_age:
+            if self._fetch_task is None or self._fetch_task.done():
+                self._fetch_task = asyncio.create_task(self._refresh_snapshot())
+            # Shield so a cancelled command doesn't abort the fetch other callers wait on
+            status_data = await asyncio.shield(self._fetch_task)
+            if status_data:
+                return status_data
+        
+        if allow_stale and self.snapshot:
+            return self.snapshot.data
+        return {}
+
+    async def _refresh_snapshot(self) -> Dict[str, str]:
+        """Fetch the status, preferring the Statuspage JSON API over the HTML page"""
+        snapshot = self.snapshot
+        result = await self._request_status(self.api_url, 'json', snapshot)
+        if result is None:
+            result = await self._request_status(self.status_url, 'html', snapshot)
+        if result is None:
+            self.poll_failures += 1
+            self.last_failure = time.monotonic()
+            if snapshot:
+                snapshot.stale = True
+            return {}
+
+        self.poll_failures = 0
+        self.last_failure = None
+        status_data, source, etag, last_modified = result
+        if status_data is None:
+            # 304 Not Modified: the cached snapshot is still current
+            snapshot.fetched_at = time.monotonic()
+            snapshot.stale = False
+            return snapshot.data
+
+        version = 1
+        if snapshot:
+            version = snapshot.version if snapshot.data == status_data else snapshot.version + 1
+        self.snapshot = StatusSnapshot(status_data, etag, last_modified, version, source)
+        if not snapshot or version != snapshot.version:
+            for _, service, previous, status in self.history.record(status_data):
+                if previous is not None:
+                    logger.info(f"FiveM status change: {service} {previous} -> {status}")
+        return status_data
+
+    async def _request_status(self, url: str, source: str, snapshot: Optional[StatusSnapshot]):
+        """Request one status source, using ETag/Last-Modified when the snapshot came from it.
+
+        Returns (status_data, source, etag, last_modified) with status_data None
+        on 304, or None if the source failed.
+        """
+        headers = {}
+        if snapshot and snapshot.source == source:
+            if snapshot.etag:
+                headers['If-None-Match'] = snapshot.etag
+            if snapshot.last_modified:
+                headers['If-Modified-Since'] = snapshot.last_modified
+
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(self.status_url) as response:
-                    if response.status == 200:
-                        content = await response.text()
-                        return self.parse_status_content(content)
-                    else:
-                        logger.error(f"Error fetching status: HTTP {response.status}")
-                        return {}
+            async with self.bot.http_session.get(url, headers=headers) as response:
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+                if response.status == 304 and headers:
+                    return None, source, etag or snapshot.etag, last_modified or snapshot.last_modified
+                if response.status != 200:
+                    logger.error(f"Error fetching status ({source}): HTTP {response.status}")
+                    return None
+                if source == 'json':
+                    status_data = self.parse_status_summary(await response.json())
+                else:
+                    status_data = self.parse_status_content(await response.text())
         except Exception as e:
-            logger.error(f"Error fetching FiveM status: {e}")
-            return {}
-    
+            logger.error(f"Error fetching FiveM status ({source}): {e}")
+            return None
+
+        return status_data, source, etag, last_modified
+
+    def parse_status_summary(self, summary: dict) -> Dict[str, str]:
+        """Map a Statuspage summary.json payload to display statuses in a single pass"""
+        components = {}
+        for component in summary.get('components', []):
+            name = normalize_component_name(component.get('name', ''))
+            # Keep the first occurrence, like the HTML parser does
+            components.setdefault(name, component.get('status'))
+
+        status_dict = {}
+        for display_name, component_name, _ in SERVICES:
+            component_status = components.get(component_name)
+            if component_status is None:
+                status_dict[display_name] = "❓ No disponible"
+            else:
+                status_dict[display_name] = COMPONENT_STATUS.get(component_status, "❓ Desconocido")
+
+        indicator = summary.get('status', {}).get('indicator')
+        status_dict["overall"] = OVERALL_STATUS.get(indicator, "❓ Estado general desconocido")
+        return status_dict
+
     def parse_status_content(self, content: str) -> Dict[str, str]:
-        """Parse the status page content to extract service statuses"""
+        """Parse the status page HTML (fallback when the JSON API is unavailable)"""
         status_dict = {}
         
-        # Map of service patterns and their display names
-        services = {
-            "FiveM": "🎮 FiveM",
-            "RedM": "🤠 RedM", 
-            "Cfx.re Platform Server \\(FXServer\\)": "🖥️ FXServer",
-            "Game Services": "🎯 Game Services",
-            "CnL": "🔗 CnL",
-            "Policy": "📋 Policy",
-            "Keymaster": "🔑 Keymaster",
-            "Web Services": "🌐 Web Services",
-            "Forums": "💬 Forums",
-            "Server List Frontend": "📋 Server List",
-            "\"Runtime\"": "⚡ Runtime",
-            "IDMS": "🆔 IDMS",
-            "Portal": "🚪 Portal"
-        }
-        
         # Look for operational status indicators
-        for service_pattern, display_name in services.items():
-            # Create regex pattern to find service status
-            pattern = rf"{service_pattern}.*?(?:Operational|Degraded Performance|Partial Outage|Major Outage|Maintenance)"
-            match = re.search(pattern, content, re.IGNORECASE | re.DOTALL)
+        for display_name, _, pattern in SERVICES:
+            match = pattern.search(content)
             
             if match:
-                text = match.group(0)
-                if "Operational" in text:
-                    status_dict[display_name] = "🟢 Operativo"
-                elif "Degraded Performance" in text:
-                    status_dict[display_name] = "🟡 Rendimiento Degradado"
-                elif "Partial Outage" in text:
-                    status_dict[display_name] = "🟠 Falla Parcial"
-                elif "Major Outage" in text:
-                    status_dict[display_name] = "🔴 Falla Mayor"
-                elif "Maintenance" in text:
-                    status_dict[display_name] = "🔧 Mantenimiento"
-                else:
-                    status_dict[display_name] = "❓ Desconocido"
+                status_dict[display_name] = HTML_STATUS.get(match.group(1).lower(), "❓ Desconocido")
             else:
                 status_dict[display_name] = "❓ No disponible"
         
@@ -179,143 +355,235 @@ class FiveMStatus(commands.Cog):
             timestamp=datetime.utcnow()
         )
         
-        # Main gaming services
-        gaming_services = []
-        for service, status in status_data.items():
-            if service in ["🎮 FiveM", "🤠 RedM", "🖥️ FXServer", "🎯 Game Services"]:
-                gaming_services.append(f"{service}: {status}")
-        
-        if gaming_services:
-            embed.add_field(
-                name="🎮 **Servicios de Juego**",
-                value="\n".join(gaming_services),
-                inline=False
-            )
-        
-        # Platform services
-        platform_services = []
-        for service, status in status_data.items():
-            if service in ["🔗 CnL", "📋 Policy", "🔑 Keymaster", "🌐 Web Services"]:
-                platform_services.append(f"{service}: {status}")
-        
-        if platform_services:
-            embed.add_field(
-                name="🛠️ **Servicios de Plataforma**",
-                value="\n".join(platform_services),
-                inline=False
-            )
-        
-        # Community services
-        community_services = []
-        for service, status in status_data.items():
-            if service in ["💬 Forums", "📋 Server List", "⚡ Runtime", "🆔 IDMS", "🚪 Portal"]:
-                community_services.append(f"{service}: {status}")
-        
-        if community_services:
-            embed.add_field(
-                name="👥 **Servicios de Comunidad**",
-                value="\n".join(community_services),
-                inline=False
-            )
+        for group_name, services in SERVICE_GROUPS:
+            lines = [f"{service}: {status_data[service]}" for service in services if service in status_data]
+            if lines:
+                embed.add_field(name=group_name, value="\n".join(lines), inline=False)
         
         embed.set_footer(
-            text="🔄 Actualizado automáticamente cada 5 minutos • PT Scripts BOT",
+            text="🔄 Se actualiza al cambiar el estado • PT Scripts BOT",
             icon_url=self.bot.user.avatar.url if self.bot.user.avatar else None
         )
         
         return embed
+
+    def render_status(self, status_data: Dict[str, str]) -> Tuple[dict, str]:
+        """Return the serialized status embed (without timestamp) and its content hash.
+
+        The result is cached per snapshot version, so the monitor, the slash
+        commands and any other consumer share one rendering of each status.
+        """
+        snapshot = self.snapshot
+        version = snapshot.version if snapshot and snapshot.data is status_data else None
+        if version is not None and self._rendered and self._rendered[0] == version:
+            return self._rendered[1], self._rendered[2]
         
-    async def load_config_and_start(self):
-        """Load configuration on first monitor run"""
-        try:
-            config = await load_config()
-            if 'servers' in config:
-                for guild_id_str, server_config in config['servers'].items():
-                    guild_id = int(guild_id_str)
-                    channel_id = server_config.get('fivem_status_channel_id')
-                    message_id = server_config.get('fivem_status_message_id')
-                    
-                    if channel_id and message_id:
-                        # Verificar que el canal y mensaje existen
-                        try:
-                            channel = self.bot.get_channel(channel_id)
-                            if channel:
-                                await channel.fetch_message(message_id)
-                                self.server_monitors[guild_id] = {
-                                    'channel_id': channel_id,
-                                    'message_id': message_id
-                                }
-                                logger.info(f"Loaded FiveM monitor for guild {guild_id}: channel={channel_id}, message={message_id}")
-                            else:
-                                logger.warning(f"FiveM status channel not found for guild {guild_id}, skipping")
-                        except discord.NotFound:
-                            logger.warning(f"FiveM status message not found for guild {guild_id}, clearing message ID")
-                            # Limpiar mensaje ID inválido
-                            config['servers'][guild_id_str]['fivem_status_message_id'] = None
-                            await save_config(config)
-                        except Exception as e:
-                            logger.error(f"Error validating FiveM status message for guild {guild_id}: {e}")
-                        
-            self.config_loaded = True
-                        
-        except Exception as e:
-            logger.error(f"Error loading FiveM monitor config on startup: {e}")
-            self.config_loaded = True  # Mark as loaded even if failed to prevent repeated attempts
-    
-    @tasks.loop(minutes=5)
+        payload = self.create_status_embed(status_data).to_dict()
+        payload.pop('timestamp', None)
+        content_hash = hashlib.sha1(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+        if version is not None:
+            self._rendered = (version, payload, content_hash)
+        return payload, content_hash
+
+    def get_status_embed(self, status_data: Dict[str, str]) -> discord.Embed:
+        """Build a status embed from the cached rendering, stamped with the current time"""
+        payload, _ = self.render_status(status_data)
+        # from_dict keeps references to nested dicts, so hand it a copy of the cached payload
+        embed = discord.Embed.from_dict(copy.deepcopy(payload))
+        embed.timestamp = discord.utils.utcnow()
+        return embed
+        
+    def next_poll_interval(self) -> float:
+        """Pick the delay before the next status check.
+
+        Polls fast while a service is down, slowly once everything has been
+        operational for STABLE_AFTER seconds, and backs off exponentially while
+        status.cfx.re keeps failing.
+        """
+        current = self.history.current
+        if self.pending_alerts or any(status.startswith(INCIDENT_PREFIXES) for status in current.values()):
+            interval = POLL_INCIDENT_INTERVAL
+        elif current and time.time() - (self.history.latest() or 0) >= STABLE_AFTER:
+            interval = POLL_STABLE_INTERVAL
+        else:
+            interval = POLL_INTERVAL
+        
+        if self.poll_failures:
+            interval = min(interval * 2 ** self.poll_failures, POLL_MAX_BACKOFF)
+        
+        # Jitter so restarts of many bots don't poll in lockstep
+        return interval * random.uniform(1 - POLL_JITTER, 1 + POLL_JITTER)
+
+    @tasks.loop(seconds=POLL_INTERVAL)
     async def status_monitor(self):
-        """Monitor FiveM status every 5 minutes and update all server messages"""
+        """Monitor FiveM status and update all server messages, at an adaptive rate"""
+        await self.update_status_messages()
+        if self.history.flush_due(HISTORY_FLUSH_INTERVAL):
+            await self.history.flush()
+        
+        interval = self.next_poll_interval()
+        self.status_monitor.change_interval(seconds=interval)
+        logger.debug(f"Status monitor: Next check in {interval:.0f}s")
+
+    async def update_status_messages(self, force: bool = False):
+        """Edit the status message of every monitored guild whose content changed.
+
+        Unchanged messages are only re-edited every HEARTBEAT_INTERVAL seconds
+        to refresh their timestamp; force=True edits all of them.
+        """
         try:
-            # Check if we need to load configuration
-            if not self.config_loaded or not self.server_monitors:
-                await self.load_config_and_start()
-                if not self.server_monitors:
-                    logger.debug("Status monitor: No monitors configured after loading config")
-                    return
-            
+            # Fetch even without monitors so the status history keeps being recorded
             logger.info("Status monitor: Checking FiveM status...")
-            status_data = await self.fetch_fivem_status()
+            status_data = await self.fetch_fivem_status(max_age=0, allow_stale=False)
             if not status_data:
                 logger.error("Status monitor: Failed to fetch status data")
                 return
             
-            # Always update the message (not just when status changes) to show it's active
-            self.last_status = status_data
-            embed = self.create_status_embed(status_data)
+            changes = self.detect_alert_changes(status_data)
+            if changes:
+                await self.send_alerts(changes)
+                # Save what was announced right away so a restart doesn't repeat it
+                await self.history.flush()
             
-            # Update messages for all configured servers
-            for guild_id, monitor_config in self.server_monitors.items():
-                channel_id = monitor_config['channel_id']
-                message_id = monitor_config['message_id']
-                
-                # Get the channel and message
-                channel = self.bot.get_channel(channel_id)
-                if not channel:
-                    logger.error(f"Status monitor: Channel {channel_id} not found for guild {guild_id}")
+            if not self.server_monitors:
+                logger.debug("Status monitor: No monitors configured")
+                return
+            
+            self.last_status = status_data
+            _, content_hash = self.render_status(status_data)
+            embed = self.get_status_embed(status_data)
+            now = time.monotonic()
+            skipped = 0
+            
+            # Update messages for all configured servers concurrently
+            jobs = []
+            for guild_id, monitor_config in list(self.server_monitors.items()):
+                if (not force and monitor_config.get('content_hash') == content_hash and
+                        now - monitor_config.get('last_edit', 0) < HEARTBEAT_INTERVAL):
+                    skipped += 1
                     continue
-                
-                try:
-                    message = await channel.fetch_message(message_id)
-                    await message.edit(embed=embed)
-                    logger.info(f"Status monitor: FiveM status message updated successfully for guild {guild_id}")
-                except discord.NotFound:
-                    # Message was deleted, remove from config and memory
-                    logger.warning(f"Status monitor: Message not found for guild {guild_id}, removing from config")
-                    del self.server_monitors[guild_id]
-                    # Update config file
-                    try:
-                        config = await load_config()
-                        if 'servers' in config and str(guild_id) in config['servers']:
-                            config['servers'][str(guild_id)]['fivem_status_message_id'] = None
-                            await save_config(config)
-                    except Exception as config_error:
-                        logger.error(f"Error updating config after message deletion: {config_error}")
-                except Exception as e:
-                    logger.error(f"Status monitor: Error updating message for guild {guild_id}: {e}")
+                jobs.append((
+                    guild_id,
+                    monitor_config['channel_id'],
+                    functools.partial(self.edit_status_message, guild_id, monitor_config, embed, content_hash)
+                ))
+            
+            started = time.monotonic()
+            results = await fan_out(jobs, concurrency=FANOUT_CONCURRENCY, timeout=FANOUT_TIMEOUT)
+            updated = 0
+            for result in results:
+                monitor_config = self.server_monitors.get(result.key)
+                if monitor_config is not None:
+                    monitor_config['last_result'] = 'ok' if result.ok else result.error
+                    monitor_config['last_latency'] = result.latency
+                if result.ok:
+                    updated += 1
+                else:
+                    logger.error(f"Status monitor: Error updating message for guild {result.key}: {result.error}")
+            
+            if results:
+                slowest = max(results, key=lambda result: result.latency)
+                logger.info(
+                    f"Status monitor: Updated {updated}/{len(results)} status message(s) in "
+                    f"{time.monotonic() - started:.2f}s (slowest: guild {slowest.key}, {slowest.latency:.2f}s)"
+                )
+            if skipped:
+                logger.info(f"Status monitor: Status unchanged, skipped {skipped} message edit(s)")
             
         except Exception as e:
             logger.error(f"Status monitor: Unexpected error: {e}")
     
+    def detect_alert_changes(self, status_data: Dict[str, str]) -> List[Tuple[str, str, str]]:
+        """Return the (service, old status, new status) changes that are due an alert.
+
+        A change is only reported once it has been seen for ALERT_DEBOUNCE
+        seconds; a service that flips back in the meantime is never reported.
+        Unknown statuses (parse failures) are ignored.
+        """
+        now = time.monotonic()
+        changes = []
+        for service, _, _ in SERVICES:
+            status = status_data.get(service)
+            if not status or status.startswith("❓"):
+                continue
+            alerted = self.alerted_status.get(service)
+            if alerted is None:
+                self.alerted_status[service] = status
+                self.history.dirty = True
+                continue
+            if status == alerted:
+                self.pending_alerts.pop(service, None)
+                continue
+            
+            pending = self.pending_alerts.get(service)
+            if pending is None or pending[0] != status:
+                self.pending_alerts[service] = (status, now)
+            elif now - pending[1] >= ALERT_DEBOUNCE:
+                changes.append((service, alerted, status))
+                self.alerted_status[service] = status
+                self.history.dirty = True
+                del self.pending_alerts[service]
+        return changes
+
+    def create_alert_embed(self, changes: List[Tuple[str, str, str]]) -> discord.Embed:
+        """Create one alert embed summarizing all the given status changes"""
+        recovered = all(new.startswith("🟢") for _, _, new in changes)
+        embed = discord.Embed(
+            title="✅ Servicios de FiveM recuperados" if recovered else "🚨 Incidencia en los servicios de FiveM",
+            description="\n".join(f"{service}: {old} → **{new}**" for service, old, new in changes) +
+                        f"\n\nMás información en [status.cfx.re]({self.status_url})",
+            color=0x00ff00 if recovered else 0xff0000,
+            timestamp=discord.utils.utcnow()
+        )
+        embed.set_footer(text="Alertas de estado de FiveM • PT Scripts BOT")
+        return embed
+
+    async def send_alerts(self, changes: List[Tuple[str, str, str]]):
+        """Send one alert per subscribed guild, fanned out with bounded concurrency"""
+        embed = self.create_alert_embed(changes)
+        jobs = []
+        for guild_id, server_config in config_store.guilds():
+            channel_id = server_config.get('fivem_alert_channel_id')
+            if not channel_id:
+                continue
+            role_id = server_config.get('fivem_alert_role_id')
+            channel = self.bot.get_partial_messageable(channel_id, guild_id=guild_id)
+            jobs.append((
+                guild_id,
+                channel_id,
+                functools.partial(
+                    channel.send,
+                    content=f"<@&{role_id}>" if role_id else None,
+                    embed=embed,
+                    allowed_mentions=discord.AllowedMentions(roles=True)
+                )
+            ))
+        
+        if not jobs:
+            return
+        results = await fan_out(jobs, concurrency=FANOUT_CONCURRENCY, timeout=FANOUT_TIMEOUT)
+        failed = [result for result in results if not result.ok]
+        for result in failed:
+            logger.error(f"FiveM alerts: Error sending alert to guild {result.key}: {result.error}")
+        logger.info(f"FiveM alerts: Sent {len(results) - len(failed)}/{len(results)} alert(s) for {len(changes)} change(s)")
+
+    async def edit_status_message(self, guild_id: int, monitor_config: dict, embed: discord.Embed, content_hash: str):
+        """Edit one guild's status message straight from the stored IDs"""
+        message = self.bot.get_partial_messageable(
+            monitor_config['channel_id'], guild_id=guild_id
+        ).get_partial_message(monitor_config['message_id'])
+        
+        try:
+            await message.edit(embed=embed)
+        except discord.NotFound:
+            # Message or channel was deleted, remove from config and memory
+            logger.warning(f"Status monitor: Message not found for guild {guild_id}, removing from config")
+            self.invalidate_monitor(guild_id)
+            raise
+        monitor_config['content_hash'] = content_hash
+        monitor_config['last_edit'] = time.monotonic()
+        logger.debug(f"Status monitor: FiveM status message updated for guild {guild_id}")
+    
     @status_monitor.before_loop
     async def before_status_monitor(self):
         await self.bot.wait_until_ready()
@@ -338,7 +606,11 @@ class FiveMStatus(commands.Cog):
                 await interaction.followup.send(embed=embed)
                 return
             
-            embed = self.create_status_embed(status_data)
+            embed = self.get_status_embed(status_data)
+            snapshot = self.snapshot
+            if snapshot and snapshot.stale and snapshot.data is status_data:
+                fetched_at = int(time.time() - snapshot.age())
+                embed.description += f"\n\n⚠️ status.cfx.re no responde; datos de <t:{fetched_at}:R>."
             await interaction.followup.send(embed=embed)
             
         except Exception as e:
@@ -379,30 +651,26 @@ class FiveMStatus(commands.Cog):
                 return
             
             # Create and send the status message
-            embed = self.create_status_embed(status_data)
+            embed = self.get_status_embed(status_data)
             message = await canal.send(embed=embed)
             
             # Store the message and channel info for this guild
             guild_id = interaction.guild.id
             self.server_monitors[guild_id] = {
                 'channel_id': canal.id,
-                'message_id': message.id
+                'message_id': message.id,
+                'content_hash': self.render_status(status_data)[1],
+                'last_edit': time.monotonic()
             }
             self.last_status = status_data
             
             # Save to config file for persistence
             try:
-                config = await load_config()
-                guild_id_str = str(interaction.guild.id)
-                if 'servers' not in config:
-                    config['servers'] = {}
-                if guild_id_str not in config['servers']:
-                    config['servers'][guild_id_str] = {}
-                
-                config['servers'][guild_id_str]['fivem_status_channel_id'] = canal.id
-                config['servers'][guild_id_str]['fivem_status_message_id'] = message.id
-                
-                await save_config(config)
+                config_store.update(
+                    interaction.guild.id,
+                    fivem_status_channel_id=canal.id,
+                    fivem_status_message_id=message.id
+                )
                 logger.info(f"FiveM monitor config saved: channel={canal.id}, message={message.id}")
             except Exception as e:
                 logger.error(f"Error saving FiveM monitor config: {e}")
@@ -410,7 +678,7 @@ class FiveMStatus(commands.Cog):
             # Confirmation message
             confirmation_embed = discord.Embed(
                 title="✅ Monitoreo configurado",
-                description=f"El estado de FiveM se mostrará en {canal.mention} y se actualizará automáticamente cada 5 minutos.\n\n"
+                description=f"El estado de FiveM se mostrará en {canal.mention} y se actualizará automáticamente cuando cambie.\n\n"
                            f"**El monitoreo persistirá** incluso si el bot se reinicia.",
                 color=0x00ff00
             )
@@ -456,17 +724,7 @@ class FiveMStatus(commands.Cog):
             
             # Remove from config file
             try:
-                config = await load_config()
-                guild_id_str = str(interaction.guild.id)
-                if ('servers' in config and 
-                    guild_id_str in config['servers']):
-                    
-                    if 'fivem_status_channel_id' in config['servers'][guild_id_str]:
-                        del config['servers'][guild_id_str]['fivem_status_channel_id']
-                    if 'fivem_status_message_id' in config['servers'][guild_id_str]:
-                        del config['servers'][guild_id_str]['fivem_status_message_id']
-                    
-                    await save_config(config)
+                if config_store.unset(interaction.guild.id, 'fivem_status_channel_id', 'fivem_status_message_id'):
                     logger.info("FiveM monitor config removed from file")
             except Exception as e:
                 logger.error(f"Error removing FiveM monitor config: {e}")
@@ -489,6 +747,87 @@ class FiveMStatus(commands.Cog):
             )
             await interaction.response.send_message(embed=embed)
     
+    @app_commands.command(name="configurar_alertas_fivem", description="Configura las alertas de incidencias de FiveM")
+    @app_commands.describe(
+        canal="Canal donde se enviarán las alertas",
+        rol="Rol a mencionar en cada alerta (opcional)"
+    )
+    async def setup_fivem_alerts(self, interaction: discord.Interaction, canal: discord.TextChannel,
+                                 rol: Optional[discord.Role] = None):
+        """Subscribe this guild to FiveM outage alerts"""
+        try:
+            if not interaction.user.guild_permissions.administrator:
+                embed = discord.Embed(
+                    title="❌ Sin permisos",
+                    description="Necesitas permisos de administrador para usar este comando.",
+                    color=0xff0000
+                )
+                await interaction.response.send_message(embed=embed, ephemeral=True)
+                return
+            
+            config_store.update(
+                interaction.guild.id,
+                fivem_alert_channel_id=canal.id,
+                fivem_alert_role_id=rol.id if rol else None
+            )
+            logger.info(f"FiveM alerts configured for guild {interaction.guild.id}: channel={canal.id}, role={rol.id if rol else None}")
+            
+            description = f"Las incidencias de FiveM se anunciarán en {canal.mention}"
+            description += f" mencionando a {rol.mention}." if rol else "."
+            embed = discord.Embed(
+                title="✅ Alertas configuradas",
+                description=description,
+                color=0x00ff00
+            )
+            await interaction.response.send_message(embed=embed)
+            
+        except Exception as e:
+            logger.error(f"Error in setup_fivem_alerts: {e}")
+            embed = discord.Embed(
+                title="❌ Error",
+                description="Ocurrió un error al configurar las alertas de FiveM.",
+                color=0xff0000
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+    
+    @app_commands.command(name="desactivar_alertas_fivem", description="Desactiva las alertas de incidencias de FiveM")
+    async def disable_fivem_alerts(self, interaction: discord.Interaction):
+        """Unsubscribe this guild from FiveM outage alerts"""
+        try:
+            if not interaction.user.guild_permissions.administrator:
+                embed = discord.Embed(
+                    title="❌ Sin permisos",
+                    description="Necesitas permisos de administrador para usar este comando.",
+                    color=0xff0000
+                )
+                await interaction.response.send_message(embed=embed, ephemeral=True)
+                return
+            
+            if not config_store.unset(interaction.guild.id, 'fivem_alert_channel_id', 'fivem_alert_role_id'):
+                embed = discord.Embed(
+                    title="ℹ️ Sin configuración",
+                    description="Las alertas de FiveM no están configuradas para este servidor.",
+                    color=0x3498db
+                )
+                await interaction.response.send_message(embed=embed, ephemeral=True)
+                return
+            
+            embed = discord.Embed(
+                title="✅ Alertas desactivadas",
+                description="Este servidor ya no recibirá alertas de FiveM.",
+                color=0x00ff00
+            )
+            await interaction.response.send_message(embed=embed)
+            
+        except Exception as e:
+            logger.error(f"Error in disable_fivem_alerts: {e}")
+            embed = discord.Embed(
+                title="❌ Error",
+                description="Ocurrió un error al desactivar las alertas de FiveM.",
+                color=0xff0000
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+    
     @app_commands.command(name="forzar_actualizacion_fivem", description="Fuerza una actualización manual del estado de FiveM")
     async def force_update_fivem(self, interaction: discord.Interaction):
         """Force manual update of FiveM status"""
@@ -517,7 +856,7 @@ class FiveMStatus(commands.Cog):
             
             # Force run the status monitor
             logger.info(f"Manual FiveM status update requested by {interaction.user}")
-            await self.status_monitor()
+            await self.update_status_messages(force=True)
             
             embed = discord.Embed(
                 title="✅ Actualización forzada",
@@ -535,6 +874,67 @@ class FiveMStatus(commands.Cog):
             )
             await interaction.followup.send(embed=embed, ephemeral=True)
     
+    @app_commands.command(name="historial_fivem", description="Muestra el historial de disponibilidad de los servicios de FiveM")
+    @app_commands.describe(horas="Horas hacia atrás a mostrar (por defecto 24)")
+    async def fivem_history_command(self, interaction: discord.Interaction, horas: app_commands.Range[int, 1, 720] = 24):
+        """Show uptime and incidents from the recorded status history"""
+        try:
+            now = time.time()
+            since = now - horas * 3600
+            uptime = self.history.uptime(since, now)
+            
+            if not uptime:
+                embed = discord.Embed(
+                    title="ℹ️ Sin datos",
+                    description="Todavía no hay historial de estado registrado.",
+                    color=0x3498db
+                )
+                await interaction.response.send_message(embed=embed, ephemeral=True)
+                return
+            
+            embed = discord.Embed(
+                title=f"📈 Historial de FiveM (últimas {horas} h)",
+                color=0x3498db,
+                timestamp=discord.utils.utcnow()
+            )
+            
+            for group_name, services in SERVICE_GROUPS:
+                lines = [
+                    f"{service}: {'🟢' if uptime[service] >= 0.999 else '🟡' if uptime[service] >= 0.95 else '🔴'} {uptime[service] * 100:.2f}%"
+                    for service in services if service in uptime
+                ]
+                if lines:
+                    embed.add_field(name=group_name, value="\n".join(lines), inline=False)
+            
+            incidents = self.history.incidents(since, now)
+            if incidents:
+                lines = []
+                for service, status, start, end, ongoing in incidents[:10]:
+                    until = "en curso" if ongoing else f"<t:{int(end)}:t>"
+                    duration = int(end - start) // 60
+                    lines.append(f"{service}: {status} · <t:{int(start)}:f> → {until} ({duration} min)")
+                if len(incidents) > 10:
+                    lines.append(f"... y {len(incidents) - 10} incidente(s) más")
+                embed.add_field(name="⚠️ **Incidentes**", value="\n".join(lines)[:1024], inline=False)
+            else:
+                embed.add_field(name="⚠️ **Incidentes**", value="✅ Sin incidentes en este periodo", inline=False)
+            
+            oldest = self.history.oldest()
+            if oldest and oldest > since:
+                embed.description = f"Historial disponible desde <t:{int(oldest)}:f>."
+            
+            embed.set_footer(text="Datos registrados por el monitor, sin consultar status.cfx.re")
+            await interaction.response.send_message(embed=embed)
+            
+        except Exception as e:
+            logger.error(f"Error in fivem_history_command: {e}")
+            embed = discord.Embed(
+                title="❌ Error",
+                description="Ocurrió un error al mostrar el historial de FiveM.",
+                color=0xff0000
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+    
     @app_commands.command(name="info_monitor_fivem", description="Muestra información sobre el monitoreo de FiveM")
     async def monitor_info_fivem(self, interaction: discord.Interaction):
         """Show information about FiveM monitoring"""
@@ -561,7 +961,7 @@ class FiveMStatus(commands.Cog):
                 )
                 embed.add_field(
                     name="Frecuencia de Actualización",
-                    value="⏰ Cada 5 minutos",
+                    value=f"⏰ Cada {self.status_monitor.seconds:.0f} s (adaptativa)",
                     inline=True
                 )
                 embed.add_field(
@@ -581,6 +981,14 @@ class FiveMStatus(commands.Cog):
                 )
                 
                 # Add global monitor information
+                if 'last_latency' in monitor_config:
+                    last_result = monitor_config.get('last_result')
+                    embed.add_field(
+                        name="Última Edición",
+                        value=f"{'✅' if last_result == 'ok' else '❌'} {monitor_config['last_latency'] * 1000:.0f} ms",
+                        inline=True
+                    )
+                
                 embed.add_field(
                     name="Servidores Monitoreados",
                     value=f"{len(self.server_monitors)} servidor(es)",
@@ -3,57 +3,16 @@ from discord.ext import commands
 from discord import app_commands
 import asyncio
 import logging
-import json
 from datetime import datetime, timedelta
 from typing import Optional
+from utils.config_store import config_store
+from utils.permissions import permission_resolver
 
 logger = logging.getLogger(__name__)
 
-async def load_config():
-    """Load configuration from config.json"""
-    try:
-        with open('config.json', 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {}
-    except Exception as e:
-        logger.error(f"Error loading config: {e}")
-        return {}
-
-async def save_config(config):
-    """Save configuration to config.json"""
-    try:
-        with open('config.json', 'w') as f:
-            json.dump(config, f, indent=2)
-        return True
-    except Exception as e:
-        logger.error(f"Error saving config: {e}")
-        return False
-
-def has_moderation_permission(user: discord.Member, guild_id: int, config: dict) -> bool:
+def has_moderation_permission(user: discord.Member, guild_id: int) -> bool:
     """Check if user has moderation permissions"""
-    # Administrators always have permission
-    if user.guild_permissions.administrator:
-        return True
-    
-    # Check if user has default Discord moderation permissions
-    if (user.guild_permissions.ban_members or 
-        user.guild_permissions.manage_messages or 
-        user.guild_permissions.moderate_members):
-        return True
-    
-    # Check configured moderation roles
-    guild_id_str = str(guild_id)
-    if ('servers' in config and 
-        guild_id_str in config['servers'] and 
-        'moderation_role_ids' in config['servers'][guild_id_str]):
-        
-        moderation_role_ids = config['servers'][guild_id_str]['moderation_role_ids']
-        for role_id in moderation_role_ids:
-            if discord.utils.get(user.roles, id=role_id):
-                return True
-    
-    return False
+    return permission_resolver.is_moderator(user)
 
 class Moderation(commands.Cog):
     def __init__(self, bot):
@@ -73,8 +32,7 @@ class Moderation(commands.Cog):
         """Delete a specified number of messages from the channel"""
         try:
             # Verificar permisos de moderación
-            config = await load_config()
-            if not has_moderation_permission(interaction.user, interaction.guild.id, config):
+            if not has_moderation_permission(interaction.user, interaction.guild.id):
                 embed = discord.Embed(
                     title="❌ Sin permisos",
                     description="No tienes permisos para usar comandos de moderación.",
@@ -182,8 +140,7 @@ class Moderation(commands.Cog):
         """Ban a user from the server"""
         try:
             # Verificar permisos de moderación
-            config = await load_config()
-            if not has_moderation_permission(interaction.user, interaction.guild.id, config):
+            if not has_moderation_permission(interaction.user, interaction.guild.id):
                 embed = discord.Embed(
                     title="❌ Sin permisos",
                     description="No tienes permisos para usar comandos de moderación.",
@@ -327,8 +284,7 @@ class Moderation(commands.Cog):
         """Timeout a user for a specified duration"""
         try:
             # Verificar permisos de moderación
-            config = await load_config()
-            if not has_moderation_permission(interaction.user, interaction.guild.id, config):
+            if not has_moderation_permission(interaction.user, interaction.guild.id):
                 embed = discord.Embed(
                     title="❌ Sin permisos",
                     description="No tienes permisos para usar comandos de moderación.",
@@ -481,8 +437,7 @@ class Moderation(commands.Cog):
         """Remove timeout from a user"""
         try:
             # Verificar permisos de moderación
-            config = await load_config()
-            if not has_moderation_permission(interaction.user, interaction.guild.id, config):
+            if not has_moderation_permission(interaction.user, interaction.guild.id):
                 embed = discord.Embed(
                     title="❌ Sin permisos",
                     description="No tienes permisos para usar comandos de moderación.",
@@ -554,21 +509,8 @@ class Moderation(commands.Cog):
     ):
         """Add a role to moderation permissions"""
         try:
-            config = await load_config()
-            guild_id_str = str(interaction.guild.id)
-            if 'servers' not in config:
-                config['servers'] = {}
-            if guild_id_str not in config['servers']:
-                config['servers'][guild_id_str] = {}
-            if 'moderation_role_ids' not in config['servers'][guild_id_str]:
-                config['servers'][guild_id_str]['moderation_role_ids'] = []
-
             # Agregar el rol si no está ya en la lista
-            if role.id not in config['servers'][guild_id_str]['moderation_role_ids']:
-                config['servers'][guild_id_str]['moderation_role_ids'].append(role.id)
-                
-                await save_config(config)
-                
+            if config_store.add_to_list(interaction.guild.id, 'moderation_role_ids', role.id):
                 embed = discord.Embed(
                     title="✅ Rol de moderación agregado",
                     description=f"Rol agregado: {role.mention}\n"
@@ -604,12 +546,7 @@ class Moderation(commands.Cog):
     ):
         """Remove a role from moderation permissions"""
         try:
-            config = await load_config()
-            guild_id_str = str(interaction.guild.id)
-            
-            if ('servers' not in config or 
-                guild_id_str not in config['servers'] or 
-                'moderation_role_ids' not in config['servers'][guild_id_str]):
+            if 'moderation_role_ids' not in config_store.get_guild(interaction.guild.id):
                 embed = discord.Embed(
                     title="❌ No hay roles configurados",
                     description="No hay roles de moderación configurados en este servidor.",
@@ -618,11 +555,7 @@ class Moderation(commands.Cog):
                 await interaction.response.send_message(embed=embed, ephemeral=True)
                 return
 
-            if role.id in config['servers'][guild_id_str]['moderation_role_ids']:
-                config['servers'][guild_id_str]['moderation_role_ids'].remove(role.id)
-                
-                await save_config(config)
-                
+            if config_store.remove_from_list(interaction.guild.id, 'moderation_role_ids', role.id):
                 embed = discord.Embed(
                     title="✅ Rol de moderación removido",
                     description=f"Rol removido: {role.mention}",
@@ -655,9 +588,7 @@ class Moderation(commands.Cog):
     ):
         """Show current moderation configuration"""
         try:
-            config = await load_config()
-            guild_id_str = str(interaction.guild.id)
-            server_config = config.get('servers', {}).get(guild_id_str, {})
+            server_config = config_store.get_guild(interaction.guild.id)
             
             embed = discord.Embed(
                 title="🛡️ Configuración del Sistema de Moderación",
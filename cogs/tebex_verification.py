@@ -4,34 +4,13 @@ from discord import app_commands
 import aiohttp
 import asyncio
 import logging
-import json
 import re
 from datetime import datetime
 from typing import Dict, Optional
+from utils.config_store import config_store
 
 logger = logging.getLogger(__name__)
 
-async def load_config():
-    """Load configuration from config.json"""
-    try:
-        with open('config.json', 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {}
-    except Exception as e:
-        logger.error(f"Error loading config: {e}")
-        return {}
-
-async def save_config(config):
-    """Save configuration to config.json"""
-    try:
-        with open('config.json', 'w') as f:
-            json.dump(config, f, indent=2)
-        return True
-    except Exception as e:
-        logger.error(f"Error saving config: {e}")
-        return False
-
 def validate_tebex_transaction_id(txn_id):
     """Validate Tebex transaction ID format"""
     if not txn_id:
@@ -63,12 +42,12 @@ class TebexVerification(commands.Cog):
             
             # Simulate API call (replace with real Tebex API call)
             # Real implementation would look like:
-            # async with aiohttp.ClientSession() as session:
-            #     headers = {'Authorization': f'Bearer {TEBEX_API_KEY}'}
-            #     async with session.get(f'https://plugin.tebex.io/payments/{transaction_id}', headers=headers) as response:
-            #         if response.status == 200:
-            #             return await response.json()
-            #         return None
+            # (use the bot-wide pooled session, never a new ClientSession per call)
+            # headers = {'Authorization': f'Bearer {TEBEX_API_KEY}'}
+            # async with self.bot.http_session.get(f'https://plugin.tebex.io/payments/{transaction_id}', headers=headers) as response:
+            #     if response.status == 200:
+            #         return await response.json()
+            #     return None
             
             # For demonstration, we'll validate format and simulate success
             return {
@@ -115,12 +94,9 @@ class TebexVerification(commands.Cog):
                 return
             
             # Check if user already has verified role
-            config = await load_config()
-            guild_id = str(interaction.guild.id)
+            server_config = config_store.get_guild(interaction.guild.id)
             
-            if ('servers' not in config or 
-                guild_id not in config['servers'] or 
-                'tebex_verified_role_id' not in config['servers'][guild_id]):
+            if 'tebex_verified_role_id' not in server_config:
                 embed = discord.Embed(
                     title="❌ Configuración faltante",
                     description="El rol de verificación no está configurado. Un administrador debe usar `/configurar_rol_tebex` primero.",
@@ -129,7 +105,7 @@ class TebexVerification(commands.Cog):
                 await interaction.followup.send(embed=embed)
                 return
             
-            verified_role_id = config['servers'][guild_id]['tebex_verified_role_id']
+            verified_role_id = server_config['tebex_verified_role_id']
             verified_role = interaction.guild.get_role(verified_role_id)
             
             if not verified_role:
@@ -203,7 +179,7 @@ class TebexVerification(commands.Cog):
                 await interaction.followup.send(embed=embed)
                 
                 # Send notification to log channel if configured
-                log_channel_id = config['servers'][guild_id].get('tebex_log_channel_id')
+                log_channel_id = server_config.get('tebex_log_channel_id')
                 if log_channel_id:
                     log_channel = self.bot.get_channel(log_channel_id)
                     if log_channel:
@@ -279,17 +255,7 @@ class TebexVerification(commands.Cog):
                 return
             
             # Save configuration
-            config = await load_config()
-            guild_id = str(interaction.guild.id)
-            
-            if 'servers' not in config:
-                config['servers'] = {}
-            if guild_id not in config['servers']:
-                config['servers'][guild_id] = {}
-            
-            config['servers'][guild_id]['tebex_verified_role_id'] = rol.id
-            
-            await save_config(config)
+            config_store.set(interaction.guild.id, 'tebex_verified_role_id', rol.id)
             
             embed = discord.Embed(
                 title="✅ Rol configurado",
@@ -336,17 +302,7 @@ class TebexVerification(commands.Cog):
                 return
             
             # Save configuration
-            config = await load_config()
-            guild_id = str(interaction.guild.id)
-            
-            if 'servers' not in config:
-                config['servers'] = {}
-            if guild_id not in config['servers']:
-                config['servers'][guild_id] = {}
-            
-            config['servers'][guild_id]['tebex_log_channel_id'] = canal.id
-            
-            await save_config(config)
+            config_store.set(interaction.guild.id, 'tebex_log_channel_id', canal.id)
             
             embed = discord.Embed(
                 title="✅ Canal de logs configurado",
@@ -370,17 +326,13 @@ class TebexVerification(commands.Cog):
     async def tebex_info(self, interaction: discord.Interaction):
         """Show Tebex verification configuration"""
         try:
-            config = await load_config()
-            guild_id = str(interaction.guild.id)
-            
             embed = discord.Embed(
                 title="📊 Configuración Tebex",
                 color=0x3498db
             )
             
-            if ('servers' in config and 
-                guild_id in config['servers']):
-                server_config = config['servers'][guild_id]
+            if config_store.has_guild(interaction.guild.id):
+                server_config = config_store.get_guild(interaction.guild.id)
                 
                 # Verified role info
                 role_id = server_config.get('tebex_verified_role_id')
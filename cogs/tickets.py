@@ -1,43 +1,127 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json
+from aiohttp import web
 import logging
-from typing import Optional
 import asyncio
+import json
+import math
+import os
+import time
 from datetime import datetime
+from typing import IO, Dict, Optional, Set, Tuple
+from utils.config_store import config_store
+from utils.ticket_registry import ticket_registry, ticket_owner_from_topic
+from utils.transcript_log import transcript_log
+from utils.job_queue import JobQueue
+from utils.rate_limit import TokenBucket
+from utils.ticket_metrics import ticket_metrics
+from utils.permissions import permission_resolver
+from utils.transcript_archive import TranscriptArchive
+from utils.transcripts import (
+    TRANSCRIPT_COMPRESSIONS, TRANSCRIPT_FORMATS, message_to_entry, read_entries, render_transcript, spooled_file
+)
 
 logger = logging.getLogger(__name__)
 
-async def load_config():
-    with open('config.json', 'r') as f:
-        return json.load(f)
-
-async def create_transcript(channel: discord.TextChannel, user: discord.User) -> str:
-    messages = []
-    async for message in channel.history(limit=None, oldest_first=True):
-        timestamp = message.created_at.strftime("%Y-%m-%d %H:%M:%S")
-        author = f"{message.author.display_name} ({message.author.name}#{message.author.discriminator})"
-        content = message.content or "[No content]"
-        if message.embeds:
-            for embed in message.embeds:
-                if embed.title:
-                    content += f"\n[Embed: {embed.title}]"
-                if embed.description:
-                    content += f"\n{embed.description}"
-        if message.attachments:
-            for attachment in message.attachments:
-                content += f"\n[Attachment: {attachment.filename}]"
-        messages.append(f"[{timestamp}] {author}: {content}")
-
-    transcript = (
-        f"Transcript del Ticket: {channel.name}\n"
-        f"Usuario: {user.display_name} ({user.name}#{user.discriminator})\n"
-        f"Creado: {channel.created_at.strftime('%Y-%m-%d %H:%M:%S')}\n"
-        f"Cerrado: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-        + "=" * 50 + "\n\n" + "\n".join(messages)
-    )
-    return transcript
+# Seconds between the close button and the channel deletion
+CLOSE_DELAY = 5
+
+# Pending ticket archival jobs and how many run at once
+ARCHIVE_JOBS_PATH = os.getenv('TICKET_ARCHIVE_JOBS_PATH', 'ticket_archive_jobs.json')
+ARCHIVE_WORKERS = 3
+
+# Ticket channels a guild may create: bursts of TICKET_CREATION_BURST, then
+# TICKET_CREATION_RATE per second on average
+TICKET_CREATION_RATE = 10 / 60
+TICKET_CREATION_BURST = 5
+
+# Serve ticket metrics in Prometheus format on this port (disabled when unset)
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+METRICS_PORT = os.getenv('METRICS_PORT')
+
+_creating_tickets: Set[Tuple[int, int]] = set()  # (guild_id, user_id) being created
+_creation_buckets: Dict[int, TokenBucket] = {}  # guild_id -> creation rate limit
+
+async def create_transcript(channel: discord.TextChannel, user: discord.abc.User,
+                            archive: Optional[TranscriptArchive] = None,
+                            closed_by: Optional[str] = None) -> Tuple[IO[bytes], str]:
+    """Build the ticket transcript in the guild's format and compression.
+
+    Messages captured while the ticket was open come from its transcript log
+    and only the newer tail is read from the channel history; without a log
+    the whole history is paged. The tail is spooled as JSON lines, then
+    rendering, compression and (if given) archiving in the searchable
+    transcript archive run in a worker thread. Returns a spooled file
+    positioned at the start (the caller must close it) and its filename.
+    """
+    server_config = config_store.get_guild(channel.guild.id)
+    meta = {
+        'channel': channel.name,
+        'user': f"{user.display_name} ({user.name}#{user.discriminator})",
+        'created': channel.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+        'closed': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+    after = None
+    logged = transcript_log.exists(channel.id)
+    if logged and not await transcript_log.flush():
+        # Queued records could not be written, so rebuild from the full history
+        logged = False
+    if logged:
+        # Messages still arriving are newer than last_id and come from the history below
+        last_id = transcript_log.last_id(channel.id)
+        if last_id:
+            after = discord.Object(id=last_id)
+
+    with spooled_file() as tail:
+        async for message in channel.history(limit=None, after=after, oldest_first=True):
+            tail.write(json.dumps(message_to_entry(message)).encode('utf-8') + b"\n")
+
+        def entries():
+            if logged:
+                yield from transcript_log.entries(channel.id, last_id)
+            yield from read_entries(tail)
+
+        def render():
+            result = render_transcript(
+                meta,
+                [entries()],
+                server_config.get('transcript_format', 'txt'),
+                server_config.get('transcript_compression', 'none'),
+                f"transcript-{channel.name}"
+            )
+            if archive:
+                try:
+                    archive.store({
+                        'channel_id': channel.id,
+                        'guild_id': channel.guild.id,
+                        'channel_name': channel.name,
+                        'creator_id': user.id,
+                        'creator_name': f"{user.display_name} ({user.name})",
+                        'closed_by': closed_by,
+                        'closed_at': time.time(),
+                    }, entries())
+                except Exception as e:
+                    logger.error(f"Error archivando transcript de {channel.name}: {e}")
+            return result
+
+        return await asyncio.to_thread(render)
+
+async def resolve_ticket_creator(client: discord.Client, guild: discord.Guild,
+                                 creator_id: Optional[int]) -> Optional[discord.abc.User]:
+    """Look up the ticket creator by ID: member cache first, then the API"""
+    if creator_id is None:
+        return None
+    member = guild.get_member(creator_id)
+    if member:
+        return member
+    try:
+        # Also works when the creator already left the guild
+        return await client.fetch_user(creator_id)
+    except discord.HTTPException as e:
+        logger.warning(f"No se pudo obtener el creador del ticket ({creator_id}): {e}")
+        return None
 
 class TicketView(discord.ui.View):
     def __init__(self):
@@ -50,26 +134,61 @@ class TicketView(discord.ui.View):
         custom_id='create_ticket'
     )
     async def create_ticket(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.defer(ephemeral=True)
         guild = interaction.guild
         user = interaction.user
 
-        existing_ticket = discord.utils.get(
-            guild.channels,
-            name=f'ticket-{user.name.lower()}-{user.discriminator}'
-        )
-        if existing_ticket:
+        # Single-flight per user: extra clicks while the first one is processed are refused
+        key = (guild.id, user.id)
+        if key in _creating_tickets:
+            await interaction.response.send_message(
+                "⏳ Tu ticket ya se está creando, espera un momento.",
+                ephemeral=True
+            )
+            return
+        _creating_tickets.add(key)
+        try:
+            await self.open_ticket(interaction, guild, user)
+        finally:
+            _creating_tickets.discard(key)
+
+    async def open_ticket(self, interaction: discord.Interaction, guild: discord.Guild, user: discord.Member):
+        await interaction.response.defer(ephemeral=True)
+
+        if existing_id := ticket_registry.get_by_user(guild.id, user.id):
+            existing_ticket = guild.get_channel(existing_id)
+            if existing_ticket:
+                await interaction.followup.send(
+                    f"❌ Ya tienes un ticket abierto: {existing_ticket.mention}",
+                    ephemeral=True
+                )
+                return
+            # Channel deleted while the bot was not watching
+            ticket_registry.remove(existing_id)
+
+        server_config = config_store.get_guild(guild.id)
+
+        max_open = server_config.get('max_open_tickets')
+        # Other users' tickets still being created count towards the cap too
+        in_flight = sum(1 for guild_id, _ in _creating_tickets if guild_id == guild.id) - 1
+        if max_open and ticket_registry.open_count(guild.id) + in_flight >= max_open:
             await interaction.followup.send(
-                f"❌ Ya tienes un ticket abierto: {existing_ticket.mention}",
+                "❌ Se ha alcanzado el límite de tickets abiertos en este servidor. Inténtalo más tarde.",
                 ephemeral=True
             )
             return
 
-        try:
-            config = await load_config()
-            guild_id_str = str(guild.id)
-            server_config = config.get('servers', {}).get(guild_id_str, {})
+        bucket = _creation_buckets.get(guild.id)
+        if bucket is None:
+            bucket = _creation_buckets[guild.id] = TokenBucket(TICKET_CREATION_RATE, TICKET_CREATION_BURST)
+        if not bucket.consume():
+            await interaction.followup.send(
+                "⏳ Se están creando demasiados tickets ahora mismo. "
+                f"Inténtalo de nuevo en {math.ceil(bucket.retry_after())} segundos.",
+                ephemeral=True
+            )
+            return
 
+        try:
             category = None
             if category_id := server_config.get('ticket_category_id'):
                 category = guild.get_channel(category_id)
@@ -100,6 +219,9 @@ class TicketView(discord.ui.View):
                 overwrites=overwrites,
                 topic=f'Support ticket for {user.display_name} ({user.id})'
             )
+            ticket_registry.add(guild.id, user.id, ticket_channel.id, ticket_channel.created_at.timestamp())
+            transcript_log.start(ticket_channel.id)
+            ticket_metrics.created(guild.id, ticket_channel.id, user.id, ticket_channel.created_at.timestamp())
 
             close_view = CloseTicketView()
 
@@ -163,18 +285,15 @@ class CloseTicketView(discord.ui.View):
         channel = interaction.channel
         can_close = False
 
-        if f'-{user.name.lower()}-{user.discriminator}' in channel.name:
+        ticket = ticket_registry.get(channel.id)
+        creator_id = ticket['user_id'] if ticket else ticket_owner_from_topic(channel.topic)
+        if creator_id is not None:
+            can_close = user.id == creator_id
+        elif f'-{user.name.lower()}-{user.discriminator}' in channel.name:
             can_close = True
 
         if not can_close:
-            config = await load_config()
-            guild_id_str = str(channel.guild.id)
-            server_config = config.get('servers', {}).get(guild_id_str, {})
-            staff_role_ids = server_config.get('staff_role_ids', [])
-            for role_id in staff_role_ids:
-                if discord.utils.get(user.roles, id=role_id):
-                    can_close = True
-                    break
+            can_close = permission_resolver.is_staff(user)
 
         if not can_close and channel.permissions_for(user).manage_channels:
             can_close = True
@@ -186,6 +305,11 @@ class CloseTicketView(discord.ui.View):
             )
             return
 
+        cog = interaction.client.get_cog('Tickets')
+        if str(channel.id) in cog.archive_queue:
+            await interaction.response.send_message("⏳ Este ticket ya se está cerrando.", ephemeral=True)
+            return
+
         embed = discord.Embed(
             title="🔒 Cerrando Ticket",
             description="Este ticket se cerrará en 5 segundos...",
@@ -194,100 +318,255 @@ class CloseTicketView(discord.ui.View):
         embed.set_footer(text=f"Cerrado por {user.display_name}", icon_url=user.display_avatar.url)
         await interaction.response.send_message(embed=embed)
 
-        ticket_creator = None
-        parts = channel.name.split('-')
-        if len(parts) >= 3:
-            username = '-'.join(parts[1:-1])
-            discriminator = parts[-1]
-            for member in channel.guild.members:
-                if member.name.lower() == username and member.discriminator == discriminator:
-                    ticket_creator = member
-                    break
+        # Transcript, uploads and deletion run in the background archive queue
+        ticket_metrics.closed(channel.id)
+        cog.archive_queue.enqueue(str(channel.id), {
+            'guild_id': channel.guild.id,
+            'channel_id': channel.id,
+            'creator_id': creator_id,
+            'closed_by_id': user.id,
+            'closed_by_name': user.display_name,
+            'closed_by_tag': str(user),
+            'close_at': time.time() + CLOSE_DELAY
+        })
+
+class Tickets(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.bot.add_view(TicketView())
+        self.bot.add_view(CloseTicketView())
+        self.archive_queue = JobQueue(
+            ARCHIVE_JOBS_PATH,
+            self.archive_ticket,
+            workers=ARCHIVE_WORKERS,
+            on_give_up=self.delete_ticket_channel
+        )
+        self.metrics_runner: Optional[web.AppRunner] = None
+        self.transcript_archive: Optional[TranscriptArchive] = None
+
+    async def cog_load(self):
+        await asyncio.to_thread(ticket_registry.load)
+        await asyncio.to_thread(transcript_log.load)
+        await asyncio.to_thread(self.archive_queue.load)
+        await asyncio.to_thread(ticket_metrics.load)
+        self.transcript_archive = await asyncio.to_thread(TranscriptArchive)
+        # Archival needs the guild cache, so the queue starts once the bot is ready
+        if self.bot.is_ready():
+            self.rebuild_registry()
+            self.archive_queue.start()
+        if METRICS_PORT:
+            await self.start_metrics_server()
+
+    async def cog_unload(self):
+        await self.archive_queue.stop()
+        await transcript_log.close()
+        await ticket_registry.close()
+        await ticket_metrics.close()
+        if self.metrics_runner:
+            await self.metrics_runner.cleanup()
+        if self.transcript_archive:
+            self.transcript_archive.close()
+
+    async def start_metrics_server(self):
+        """Expose the ticket metrics at http://METRICS_HOST:METRICS_PORT/metrics"""
+        async def metrics(request: web.Request) -> web.Response:
+            return web.Response(text=ticket_metrics.prometheus(), content_type='text/plain')
+
+        app = web.Application()
+        app.router.add_get('/metrics', metrics)
+        self.metrics_runner = web.AppRunner(app)
+        await self.metrics_runner.setup()
+        await web.TCPSite(self.metrics_runner, METRICS_HOST, int(METRICS_PORT)).start()
+        logger.info(f"Métricas de tickets disponibles en http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+
+    async def archive_ticket(self, job: dict):
+        """Archive a closed ticket: transcript, uploads, then channel deletion.
+
+        Runs in the archive queue. Completed steps are recorded in the job
+        state so a retry doesn't upload the transcript twice.
+        """
+        payload, state = job['payload'], job['state']
+        guild = self.bot.get_guild(payload['guild_id'])
+        if guild is None or guild.unavailable:
+            # Not cached yet or in an outage: retry later instead of dropping the job
+            raise RuntimeError(f"Servidor {payload['guild_id']} no disponible")
+        channel = guild.get_channel(payload['channel_id'])
+        if channel is None:
+            logger.warning(f"El ticket {payload['channel_id']} ya no existe, se omite el archivado")
+            return
 
+        if not state.get('transcripts_sent'):
+            await self.send_transcripts(channel, payload, state)
+            state['transcripts_sent'] = True
+            self.archive_queue.save()
+
+        await asyncio.sleep(max(0, payload['close_at'] - time.time()))
+        await self.delete_ticket_channel(job)
+
+    async def delete_ticket_channel(self, job: dict):
+        payload = job['payload']
+        channel = self.bot.get_channel(payload['channel_id'])
+        if channel is None:
+            return
         try:
-            if ticket_creator:
-                transcript_content = await create_transcript(channel, ticket_creator)
+            await channel.delete(reason=f"Ticket cerrado por {payload['closed_by_tag']}")
+            logger.info(f"Ticket {channel.name} cerrado por {payload['closed_by_tag']} ({payload['closed_by_id']})")
+        except discord.NotFound:
+            pass
 
-                import io
-                transcript_file = io.StringIO(transcript_content)
-                file = discord.File(transcript_file, filename=f"transcript-{channel.name}.txt")
+    async def send_transcripts(self, channel: discord.TextChannel, payload: dict, state: dict):
+        """Upload the transcript to the transcript channel and the creator's DM"""
+        ticket_creator = await resolve_ticket_creator(self.bot, channel.guild, payload['creator_id'])
+        if not ticket_creator:
+            return
 
-                config = await load_config()
-                guild_id_str = str(channel.guild.id)
-                server_config = config.get('servers', {}).get(guild_id_str, {})
+        closed_by = payload['closed_by_name']
+        transcript_channel_id = config_store.get(channel.guild.id, 'transcript_channel_id')
+        transcript_channel = channel.guild.get_channel(transcript_channel_id) if transcript_channel_id else None
 
-                transcript_channel_id = server_config.get('transcript_channel_id')
-                if transcript_channel_id:
-                    transcript_channel = channel.guild.get_channel(transcript_channel_id)
-                    if transcript_channel:
-                        transcript_embed = discord.Embed(
-                            title="📝 Transcript del Ticket",
-                            description=(
-                                f"**Canal:** {channel.name}\n"
-                                f"**Usuario:** {ticket_creator.display_name}\n"
-                                f"**Cerrado por:** {user.display_name}\n"
-                                f"**Fecha:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-                            ),
-                            color=0x3498db
-                        )
-                        await transcript_channel.send(embed=transcript_embed, file=file)
-
-                # Siempre intentar enviar DM al creador del ticket
+        transcript_file, filename = await create_transcript(
+            channel, ticket_creator, archive=self.transcript_archive, closed_by=closed_by
+        )
+        with transcript_file:
+            if transcript_channel and not state.get('channel_sent'):
+                transcript_embed = discord.Embed(
+                    title="📝 Transcript del Ticket",
+                    description=(
+                        f"**Canal:** {channel.name}\n"
+                        f"**Usuario:** {ticket_creator.display_name}\n"
+                        f"**Cerrado por:** {closed_by}\n"
+                        f"**Fecha:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+                    ),
+                    color=0x3498db
+                )
+                try:
+                    await transcript_channel.send(
+                        embed=transcript_embed, file=discord.File(transcript_file, filename=filename)
+                    )
+                except discord.HTTPException as e:
+                    if e.status >= 500:
+                        raise
+                    # Permanent (e.g. 413, transcript too large): a retry would fail the same way
+                    logger.error(f"Error enviando transcript al canal {transcript_channel.id}: {e}")
+                state['channel_sent'] = True
+                self.archive_queue.save()
+
+            # Siempre intentar enviar DM al creador del ticket
+            try:
+                # The same spooled file is uploaded again, from the start
+                transcript_file.seek(0)
+                dm_embed = discord.Embed(
+                    title="📝 Transcript de tu Ticket",
+                    description=(
+                        f"Tu ticket en **{channel.guild.name}** ha sido cerrado.\n"
+                        "Aquí tienes el transcript completo de la conversación.\n\n"
+                        f"**Cerrado por:** {closed_by}\n"
+                        f"**Fecha de cierre:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+                    ),
+                    color=0x3498db
+                )
+                dm_embed.set_footer(text=f"Servidor: {channel.guild.name}")
+                await ticket_creator.send(embed=dm_embed, file=discord.File(transcript_file, filename=filename))
+                logger.info(f"Transcript DM enviado exitosamente a {ticket_creator} ({ticket_creator.id})")
+            except discord.Forbidden:
+                logger.warning(f"No se pudo enviar transcript DM a {ticket_creator} - DMs deshabilitados")
+                # Intentar notificar en el servidor si no se puede enviar DM
                 try:
-                    transcript_file_dm = io.StringIO(transcript_content)
-                    file_dm = discord.File(transcript_file_dm, filename=f"transcript-{channel.name}.txt")
-                    dm_embed = discord.Embed(
-                        title="📝 Transcript de tu Ticket",
+                    notification_embed = discord.Embed(
+                        title="⚠️ No se pudo enviar transcript por DM",
                         description=(
-                            f"Tu ticket en **{channel.guild.name}** ha sido cerrado.\n"
-                            "Aquí tienes el transcript completo de la conversación.\n\n"
-                            f"**Cerrado por:** {user.display_name}\n"
-                            f"**Fecha de cierre:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+                            f"{ticket_creator.mention}, tu ticket ha sido cerrado pero no pudimos enviarte el transcript por DM.\n"
+                            "Por favor, habilita los mensajes directos para recibir transcripts en el futuro."
                         ),
-                        color=0x3498db
+                        color=0xffaa00
                     )
-                    dm_embed.set_footer(text=f"Servidor: {channel.guild.name}")
-                    await ticket_creator.send(embed=dm_embed, file=file_dm)
-                    logger.info(f"Transcript DM enviado exitosamente a {ticket_creator} ({ticket_creator.id})")
-                except discord.Forbidden:
-                    logger.warning(f"No se pudo enviar transcript DM a {ticket_creator} - DMs deshabilitados")
-                    # Intentar notificar en el servidor si no se puede enviar DM
-                    try:
-                        notification_embed = discord.Embed(
-                            title="⚠️ No se pudo enviar transcript por DM",
-                            description=(
-                                f"{ticket_creator.mention}, tu ticket ha sido cerrado pero no pudimos enviarte el transcript por DM.\n"
-                                "Por favor, habilita los mensajes directos para recibir transcripts en el futuro."
-                            ),
-                            color=0xffaa00
-                        )
-                        if transcript_channel_id:
-                            transcript_channel = channel.guild.get_channel(transcript_channel_id)
-                            if transcript_channel:
-                                await transcript_channel.send(embed=notification_embed)
-                    except Exception as notif_error:
-                        logger.error(f"Error enviando notificación de DM fallido: {notif_error}")
-                except Exception as e:
-                    logger.error(f"Error enviando transcript DM: {e}")
+                    if transcript_channel:
+                        await transcript_channel.send(embed=notification_embed)
+                except Exception as notif_error:
+                    logger.error(f"Error enviando notificación de DM fallido: {notif_error}")
+            except discord.HTTPException as e:
+                if e.status >= 500:
+                    raise
+                # Permanent (e.g. 413, transcript too large): a retry would fail the same way
+                logger.error(f"Error enviando transcript DM: {e}")
 
-        except Exception as e:
-            logger.error(f"Error creando transcript: {e}")
+    def rebuild_registry(self):
+        """Re-index the open tickets of every guild from its channels"""
+        total = 0
+        for guild in self.bot.guilds:
+            total += ticket_registry.rebuild(guild, config_store.get(guild.id, 'ticket_category_id'))
+        logger.info(f"Registro de tickets reconstruido: {total} ticket(s) abierto(s)")
+        closed = ticket_metrics.reconcile(lambda channel_id: ticket_registry.get(channel_id) is not None)
+        if closed:
+            logger.info(f"Métricas: {closed} ticket(s) borrado(s) sin el bot marcado(s) como cerrado(s)")
 
-        await asyncio.sleep(5)
+    async def catch_up_transcript_logs(self):
+        """Append the messages sent while the bot was offline to the open tickets' logs"""
+        for channel_id in list(transcript_log.active):
+            channel = self.bot.get_channel(channel_id)
+            if channel is None:
+                if ticket_registry.get(channel_id) is None:
+                    # Ticket closed while the bot was offline
+                    await transcript_log.discard(channel_id)
+                continue
+            try:
+                last_id = transcript_log.last_id(channel_id)
+                after = discord.Object(id=last_id) if last_id else None
+                async for message in channel.history(limit=None, after=after, oldest_first=True):
+                    transcript_log.add(channel_id, message.id, message_to_entry(message))
+            except Exception as e:
+                logger.error(f"Error actualizando el log del ticket {channel_id}: {e}")
 
-        try:
-            await channel.delete(reason=f"Ticket cerrado por {user}")
-            logger.info(f"Ticket {channel.name} cerrado por {user} ({user.id})")
-        except discord.NotFound:
-            pass
-        except Exception as e:
-            logger.error(f"Error cerrando ticket: {e}")
+    @commands.Cog.listener()
+    async def on_ready(self):
+        self.rebuild_registry()
+        await self.catch_up_transcript_logs()
+        self.archive_queue.start()
 
-class Tickets(commands.Cog):
-    def __init__(self, bot):
-        self.bot = bot
-        self.bot.add_view(TicketView())
-        self.bot.add_view(CloseTicketView())
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        if transcript_log.exists(message.channel.id):
+            transcript_log.add(message.channel.id, message.id, message_to_entry(message))
+
+        ticket = ticket_metrics.needs_first_response(message.channel.id)
+        if ticket and not message.author.bot and message.author.id != ticket['user_id']:
+            author = message.author
+            if isinstance(author, discord.Member) and (
+                permission_resolver.is_staff(author)
+                or message.channel.permissions_for(author).manage_channels
+            ):
+                ticket_metrics.first_response(message.channel.id, message.created_at.timestamp())
+
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent):
+        if transcript_log.exists(payload.channel_id):
+            transcript_log.edit(payload.channel_id, payload.message_id, message_to_entry(payload.message))
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        transcript_log.delete(payload.channel_id, payload.message_id)
+
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent):
+        for message_id in payload.message_ids:
+            transcript_log.delete(payload.channel_id, message_id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel: discord.abc.GuildChannel):
+        if not isinstance(channel, discord.TextChannel) or not channel.name.startswith('ticket-'):
+            return
+        if ticket_registry.get(channel.id):
+            return
+        user_id = ticket_owner_from_topic(channel.topic)
+        if user_id is not None:
+            ticket_registry.add(channel.guild.id, user_id, channel.id, channel.created_at.timestamp())
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        ticket_registry.remove(channel.id)
+        await transcript_log.discard(channel.id)
+        # Tickets deleted by hand instead of with the close button
+        ticket_metrics.closed(channel.id)
 
     @app_commands.command(name="ticket-panel", description="Crear un panel de tickets con botón")
     @app_commands.describe(channel="Canal para enviar el panel de tickets (opcional)")
@@ -353,16 +632,7 @@ class Tickets(commands.Cog):
         category: discord.CategoryChannel
     ):
         try:
-            config = await load_config()
-            guild_id_str = str(interaction.guild.id)
-            if 'servers' not in config:
-                config['servers'] = {}
-            if guild_id_str not in config['servers']:
-                config['servers'][guild_id_str] = {}
-
-            config['servers'][guild_id_str]['ticket_category_id'] = category.id
-            with open('config.json', 'w') as f:
-                json.dump(config, f, indent=2)
+            config_store.set(interaction.guild.id, 'ticket_category_id', category.id)
             await interaction.response.send_message(
                 f"✅ Categoría de tickets establecida en: {category.name}",
                 ephemeral=True
@@ -385,22 +655,8 @@ class Tickets(commands.Cog):
         role: discord.Role
     ):
         try:
-            config = await load_config()
-            guild_id_str = str(interaction.guild.id)
-            if 'servers' not in config:
-                config['servers'] = {}
-            if guild_id_str not in config['servers']:
-                config['servers'][guild_id_str] = {}
-            if 'staff_role_ids' not in config['servers'][guild_id_str]:
-                config['servers'][guild_id_str]['staff_role_ids'] = []
-
             # Agregar el rol si no está ya en la lista
-            if role.id not in config['servers'][guild_id_str]['staff_role_ids']:
-                config['servers'][guild_id_str]['staff_role_ids'].append(role.id)
-                
-                with open('config.json', 'w') as f:
-                    json.dump(config, f, indent=2)
-                
+            if config_store.add_to_list(interaction.guild.id, 'staff_role_ids', role.id):
                 await interaction.response.send_message(
                     f"✅ Rol de staff agregado: {role.mention}\n"
                     f"Los miembros con este rol ahora pueden cerrar y gestionar tickets.",
@@ -429,24 +685,14 @@ class Tickets(commands.Cog):
         role: discord.Role
     ):
         try:
-            config = await load_config()
-            guild_id_str = str(interaction.guild.id)
-            
-            if ('servers' not in config or 
-                guild_id_str not in config['servers'] or 
-                'staff_role_ids' not in config['servers'][guild_id_str]):
+            if 'staff_role_ids' not in config_store.get_guild(interaction.guild.id):
                 await interaction.response.send_message(
                     "❌ No hay roles de staff configurados en este servidor.",
                     ephemeral=True
                 )
                 return
 
-            if role.id in config['servers'][guild_id_str]['staff_role_ids']:
-                config['servers'][guild_id_str]['staff_role_ids'].remove(role.id)
-                
-                with open('config.json', 'w') as f:
-                    json.dump(config, f, indent=2)
-                
+            if config_store.remove_from_list(interaction.guild.id, 'staff_role_ids', role.id):
                 await interaction.response.send_message(
                     f"✅ Rol de staff removido: {role.mention}",
                     ephemeral=True
@@ -484,16 +730,7 @@ class Tickets(commands.Cog):
                 )
                 return
 
-            config = await load_config()
-            guild_id_str = str(interaction.guild.id)
-            if 'servers' not in config:
-                config['servers'] = {}
-            if guild_id_str not in config['servers']:
-                config['servers'][guild_id_str] = {}
-
-            config['servers'][guild_id_str]['transcript_channel_id'] = channel.id
-            with open('config.json', 'w') as f:
-                json.dump(config, f, indent=2)
+            config_store.set(interaction.guild.id, 'transcript_channel_id', channel.id)
             
             await interaction.response.send_message(
                 f"✅ Canal de transcripts establecido en: {channel.mention}\n"
@@ -516,21 +753,12 @@ class Tickets(commands.Cog):
         interaction: discord.Interaction
     ):
         try:
-            config = await load_config()
-            guild_id_str = str(interaction.guild.id)
-            
-            if ('servers' not in config or 
-                guild_id_str not in config['servers'] or 
-                'transcript_channel_id' not in config['servers'][guild_id_str]):
+            if not config_store.unset(interaction.guild.id, 'transcript_channel_id'):
                 await interaction.response.send_message(
                     "❌ No hay canal de transcripts configurado en este servidor.",
                     ephemeral=True
                 )
                 return
-
-            del config['servers'][guild_id_str]['transcript_channel_id']
-            with open('config.json', 'w') as f:
-                json.dump(config, f, indent=2)
             
             await interaction.response.send_message(
                 "✅ Canal de transcripts desactivado.\n"
@@ -546,6 +774,168 @@ class Tickets(commands.Cog):
                 ephemeral=True
             )
 
+    @app_commands.command(name="set-max-tickets", description="Establecer el máximo de tickets abiertos a la vez")
+    @app_commands.describe(cantidad="Máximo de tickets abiertos en el servidor (0 = sin límite)")
+    @app_commands.default_permissions(manage_channels=True)
+    async def set_max_tickets(
+        self,
+        interaction: discord.Interaction,
+        cantidad: app_commands.Range[int, 0, 500]
+    ):
+        try:
+            if cantidad:
+                config_store.set(interaction.guild.id, 'max_open_tickets', cantidad)
+                message = f"✅ Máximo de tickets abiertos establecido en **{cantidad}**."
+            else:
+                config_store.unset(interaction.guild.id, 'max_open_tickets')
+                message = "✅ Límite de tickets abiertos desactivado."
+            await interaction.response.send_message(message, ephemeral=True)
+            logger.info(f"Máximo de tickets establecido a {cantidad} por {interaction.user}")
+
+        except Exception as e:
+            logger.error(f"Error guardando máximo de tickets: {e}")
+            await interaction.response.send_message(
+                "❌ Ocurrió un error al establecer el máximo de tickets!",
+                ephemeral=True
+            )
+
+    @app_commands.command(name="set-transcript-format", description="Establecer formato y compresión de los transcripts")
+    @app_commands.describe(
+        formato="Formato del transcript",
+        compresion="Compresión del archivo (útil para tickets muy largos)"
+    )
+    @app_commands.choices(
+        formato=[app_commands.Choice(name=name, value=name) for name in TRANSCRIPT_FORMATS],
+        compresion=[app_commands.Choice(name=name, value=name) for name in TRANSCRIPT_COMPRESSIONS]
+    )
+    @app_commands.default_permissions(manage_channels=True)
+    async def set_transcript_format(
+        self,
+        interaction: discord.Interaction,
+        formato: str,
+        compresion: str = 'none'
+    ):
+        try:
+            config_store.update(
+                interaction.guild.id,
+                transcript_format=formato,
+                transcript_compression=compresion
+            )
+            await interaction.response.send_message(
+                f"✅ Los transcripts se generarán en formato **{formato}**"
+                + (f" comprimidos con **{compresion}**." if compresion != 'none' else "."),
+                ephemeral=True
+            )
+            logger.info(f"Formato de transcripts establecido a {formato}/{compresion} por {interaction.user}")
+
+        except Exception as e:
+            logger.error(f"Error guardando formato de transcripts: {e}")
+            await interaction.response.send_message(
+                "❌ Ocurrió un error al establecer el formato de transcripts!",
+                ephemeral=True
+            )
+
+    @app_commands.command(name="ticket-stats", description="Mostrar estadísticas de los tickets")
+    @app_commands.default_permissions(manage_channels=True)
+    async def ticket_stats(
+        self,
+        interaction: discord.Interaction
+    ):
+        try:
+            stats = ticket_metrics.summary(interaction.guild.id)
+
+            def duration(seconds: Optional[float]) -> str:
+                if seconds is None:
+                    return "Sin datos"
+                if seconds == float('inf'):
+                    return "> 7 días"
+                if seconds < 3600:
+                    return f"≤ {seconds // 60:.0f} min"
+                if seconds < 86400:
+                    return f"≤ {seconds // 3600:.0f} h"
+                return f"≤ {seconds // 86400:.0f} días"
+
+            embed = discord.Embed(
+                title="📊 Estadísticas de Tickets",
+                color=0x3498db
+            )
+            embed.add_field(name="📂 Abiertos", value=str(ticket_registry.open_count(interaction.guild.id)), inline=True)
+            embed.add_field(name="🎫 Creados", value=str(stats['created']), inline=True)
+            embed.add_field(name="🔒 Cerrados", value=str(stats['closed']), inline=True)
+            embed.add_field(
+                name="📅 Tickets por Día",
+                value=f"Hoy: {stats['today']}\nMedia 7 días: {stats['per_day']:.1f}",
+                inline=True
+            )
+            embed.add_field(
+                name="⏱️ Primera Respuesta del Staff",
+                value=(
+                    f"p50: {duration(stats['first_response_p50'])}\n"
+                    f"p95: {duration(stats['first_response_p95'])}\n"
+                    f"({stats['first_response_count']} ticket(s) respondidos)"
+                ),
+                inline=True
+            )
+            embed.add_field(
+                name="✅ Tiempo hasta el Cierre",
+                value=f"p50: {duration(stats['resolution_p50'])}\np95: {duration(stats['resolution_p95'])}",
+                inline=True
+            )
+            embed.set_footer(text=f"Servidor: {interaction.guild.name}")
+
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+
+        except Exception as e:
+            logger.error(f"Error mostrando estadísticas de tickets: {e}")
+            await interaction.response.send_message(
+                "❌ Ocurrió un error al mostrar las estadísticas de tickets!",
+                ephemeral=True
+            )
+
+    @app_commands.command(name="buscar-ticket", description="Buscar en los transcripts de tickets cerrados")
+    @app_commands.describe(consulta="Palabras a buscar en mensajes, autores o datos del ticket")
+    @app_commands.default_permissions(manage_channels=True)
+    async def search_tickets(
+        self,
+        interaction: discord.Interaction,
+        consulta: str
+    ):
+        try:
+            results = await asyncio.to_thread(self.transcript_archive.search, interaction.guild.id, consulta)
+
+            if not results:
+                await interaction.response.send_message(
+                    f"🔍 No se encontraron tickets para: **{consulta}**",
+                    ephemeral=True
+                )
+                return
+
+            embed = discord.Embed(
+                title=f"🔍 Resultados para: {consulta}"[:256],
+                color=0x3498db
+            )
+            for result in results:
+                embed.add_field(
+                    name=result['channel_name'],
+                    value=(
+                        f"**Usuario:** {result['creator_name'] or result['creator_id']}\n"
+                        f"**Cerrado:** <t:{int(result['closed_at'])}:f> por {result['closed_by'] or 'desconocido'}\n"
+                        f"**Mensajes:** {result['message_count']}\n"
+                        f"> {result['snippet']}"
+                    )[:1024],
+                    inline=False
+                )
+            embed.set_footer(text=f"{len(results)} ticket(s) encontrados")
+
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+
+        except Exception as e:
+            logger.error(f"Error buscando tickets: {e}")
+            await interaction.response.send_message(
+                "❌ Ocurrió un error al buscar en los transcripts!",
+                ephemeral=True
+            )
+
     @app_commands.command(name="ticket-info", description="Mostrar configuración actual del sistema de tickets")
     @app_commands.default_permissions(manage_channels=True)
     async def ticket_info(
@@ -553,9 +943,7 @@ class Tickets(commands.Cog):
         interaction: discord.Interaction
     ):
         try:
-            config = await load_config()
-            guild_id_str = str(interaction.guild.id)
-            server_config = config.get('servers', {}).get(guild_id_str, {})
+            server_config = config_store.get_guild(interaction.guild.id)
             
             embed = discord.Embed(
                 title="🎫 Configuración del Sistema de Tickets",
@@ -607,6 +995,22 @@ class Tickets(commands.Cog):
                 inline=False
             )
             
+            # Límite de tickets
+            max_open = server_config.get('max_open_tickets')
+            embed.add_field(
+                name="🚦 Tickets Abiertos",
+                value=f"{ticket_registry.open_count(interaction.guild.id)} / {max_open or 'sin límite'}",
+                inline=False
+            )
+            
+            # Formato de transcripts
+            embed.add_field(
+                name="🗂️ Formato de Transcripts",
+                value=f"{server_config.get('transcript_format', 'txt')} "
+                      f"(compresión: {server_config.get('transcript_compression', 'none')})",
+                inline=False
+            )
+            
             embed.set_footer(text=f"Servidor: {interaction.guild.name}")
             
             await interaction.response.send_message(embed=embed, ephemeral=True)
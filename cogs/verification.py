@@ -1,24 +1,239 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json
+import asyncio
 import logging
-from typing import Optional
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple
+from utils.config_store import config_store, get_server_config
 
 logger = logging.getLogger(__name__)
 
-def get_server_config(guild_id: int):
-    try:
-        with open("config.json", "r") as f:
-            data = json.load(f)
-        return data["servers"].get(str(guild_id))
-    except Exception as e:
-        logging.error(f"Error loading config for guild {guild_id}: {e}")
-        return None
+# How many non-panel message IDs to remember (each legacy message is fetched once per run)
+NEGATIVE_CACHE_SIZE = 1024
+
+# Seconds between role changes in the same guild (keeps the member role route below its limit)
+ROLE_CHANGE_INTERVAL = 0.5
+# Seconds between confirmation DMs; DMs are low priority and dropped when the lane is full
+DM_INTERVAL = 1.0
+DM_QUEUE_SIZE = 500
+
+class RoleQueueMetrics:
+    """Counters and latency samples for the verification role queue"""
+
+    def __init__(self, samples: int = 500):
+        self.enqueued = 0
+        self.deduplicated = 0
+        self.applied = 0
+        self.skipped = 0
+        self.failed = 0
+        self.dms_sent = 0
+        self.dms_dropped = 0
+        self.latencies = deque(maxlen=samples)  # seconds from reaction to role change
+
+    def latency_summary(self) -> Tuple[float, float]:
+        """Return (average, p95) latency in seconds over the recent samples"""
+        if not self.latencies:
+            return 0.0, 0.0
+        ordered = sorted(self.latencies)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        return sum(ordered) / len(ordered), p95
+
+class GuildRoleQueue:
+    """Pending verification role changes for one guild.
+
+    Only the latest wanted state per user is kept, so add/remove toggles made
+    before the worker reaches a user collapse into a single change (or none).
+    """
+
+    def __init__(self, guild_id: int):
+        self.guild_id = guild_id
+        self.pending: Dict[int, Tuple[bool, float]] = {}  # user_id -> (add, enqueued_at)
+        self.task: Optional[asyncio.Task] = None
 
 class Verification(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.panel_message_ids = set()  # IDs of verification panels posted by the bot
+        self.non_panel_message_ids = {}  # Legacy lookups that were not panels (insertion ordered)
+        self.role_queues: Dict[int, GuildRoleQueue] = {}
+        self.dm_queue: asyncio.Queue = asyncio.Queue(maxsize=DM_QUEUE_SIZE)
+        self.dm_task: Optional[asyncio.Task] = None
+        self.metrics = RoleQueueMetrics()
+
+    async def cog_load(self):
+        """Build the panel index from the stored message IDs"""
+        now = time.time()
+        for guild_id, server_config in config_store.guilds():
+            self.panel_message_ids.update(server_config.get('verification_message_ids', []))
+            if 'verification_legacy_cutoff' not in server_config:
+                # Panels are recorded from now on; only older messages can be unrecorded panels
+                config_store.set(guild_id, 'verification_legacy_cutoff', now)
+        logger.info(f"Loaded {len(self.panel_message_ids)} verification panel(s)")
+        self.dm_task = asyncio.create_task(self.dm_worker())
+
+    async def cog_unload(self):
+        for queue in self.role_queues.values():
+            if queue.task:
+                queue.task.cancel()
+        if self.dm_task:
+            self.dm_task.cancel()
+
+    def queue_depth(self) -> int:
+        return sum(len(queue.pending) for queue in self.role_queues.values())
+
+    def enqueue_role_change(self, guild_id: int, user_id: int, add: bool, has_role: bool):
+        """Queue a role change for a user, replacing any pending change for them"""
+        queue = self.role_queues.get(guild_id)
+        if queue is None:
+            queue = self.role_queues[guild_id] = GuildRoleQueue(guild_id)
+
+        if user_id in queue.pending:
+            _, enqueued_at = queue.pending.pop(user_id)
+            self.metrics.deduplicated += 1
+        elif has_role == add:
+            return
+        else:
+            enqueued_at = time.monotonic()
+            self.metrics.enqueued += 1
+        queue.pending[user_id] = (add, enqueued_at)
+
+        if queue.task is None or queue.task.done():
+            queue.task = asyncio.create_task(self.role_worker(queue))
+
+    async def role_worker(self, queue: GuildRoleQueue):
+        """Apply queued role changes for one guild, paced to the route limit"""
+        processed = 0
+        while queue.pending:
+            user_id = next(iter(queue.pending))
+            add, enqueued_at = queue.pending.pop(user_id)
+            try:
+                await self.apply_role_change(queue.guild_id, user_id, add)
+            except Exception as e:
+                self.metrics.failed += 1
+                logger.error(f"Error applying verification role change: {e}")
+            self.metrics.latencies.append(time.monotonic() - enqueued_at)
+            processed += 1
+            await asyncio.sleep(ROLE_CHANGE_INTERVAL)
+
+        self.role_queues.pop(queue.guild_id, None)
+        if processed > 1:
+            average, p95 = self.metrics.latency_summary()
+            logger.info(
+                f"Verification queue drained for guild {queue.guild_id}: {processed} change(s), "
+                f"avg latency {average:.1f}s, p95 {p95:.1f}s"
+            )
+
+    async def apply_role_change(self, guild_id: int, user_id: int, add: bool):
+        guild = self.bot.get_guild(guild_id)
+        config = get_server_config(guild_id)
+        if not guild or not config:
+            return
+
+        user = guild.get_member(user_id)
+        if not user:
+            return
+
+        role = guild.get_role(config["verification_role_id"])
+        if not role:
+            logger.error(f"Verification role {config['verification_role_id']} not found in {guild.name}")
+            return
+
+        # The user may have toggled back to the current state while queued
+        if (role in user.roles) == add:
+            self.metrics.skipped += 1
+            return
+
+        if add:
+            try:
+                await user.add_roles(role, reason="Verification reaction")
+                self.metrics.applied += 1
+                logger.info(f"Added verification role to {user} in {guild.name}")
+                self.enqueue_dm(user, guild.name)
+            except discord.Forbidden:
+                self.metrics.failed += 1
+                logger.error(f"Missing permissions to add roles in {guild.name}")
+            except Exception as e:
+                self.metrics.failed += 1
+                logger.error(f"Error adding role: {e}")
+        else:
+            try:
+                await user.remove_roles(role, reason="Verification reaction removed")
+                self.metrics.applied += 1
+                logger.info(f"Removed verification role from {user} in {guild.name}")
+            except discord.Forbidden:
+                self.metrics.failed += 1
+                logger.error(f"Missing permissions to remove roles in {guild.name}")
+            except Exception as e:
+                self.metrics.failed += 1
+                logger.error(f"Error removing role: {e}")
+
+    def enqueue_dm(self, user: discord.Member, guild_name: str):
+        try:
+            self.dm_queue.put_nowait((user, guild_name))
+        except asyncio.QueueFull:
+            self.metrics.dms_dropped += 1
+
+    async def dm_worker(self):
+        """Send verification confirmation DMs in the background at a slow pace"""
+        while True:
+            user, guild_name = await self.dm_queue.get()
+            try:
+                dm_embed = discord.Embed(
+                    title="✅ Verification Complete",
+                    description=f"You have been successfully verified in **{guild_name}**!",
+                    color=0x00ff00
+                )
+                await user.send(embed=dm_embed)
+                self.metrics.dms_sent += 1
+            except (discord.Forbidden, discord.HTTPException):
+                pass
+            except Exception as e:
+                logger.error(f"Error sending verification DM: {e}")
+            await asyncio.sleep(DM_INTERVAL)
+
+    def record_panel(self, guild_id: int, message_id: int):
+        self.panel_message_ids.add(message_id)
+        config_store.add_to_list(guild_id, 'verification_message_ids', message_id)
+
+    async def is_verification_panel(self, payload, channel) -> bool:
+        """Check if the reacted message is a verification panel.
+
+        Recorded panels are answered from memory, as is every message posted
+        after the guild's verification_legacy_cutoff (panels are recorded
+        since then). Only older messages, which may be panels posted before
+        IDs were recorded, are fetched; the result is cached for this run.
+        """
+        if payload.message_id in self.panel_message_ids:
+            return True
+        cutoff = config_store.get(payload.guild_id, 'verification_legacy_cutoff')
+        if cutoff is None or discord.utils.snowflake_time(payload.message_id).timestamp() >= cutoff:
+            return False
+        if payload.message_id in self.non_panel_message_ids:
+            return False
+
+        try:
+            message = await channel.fetch_message(payload.message_id)
+        except discord.NotFound:
+            message = None
+
+        if (message and message.author == self.bot.user and message.embeds and
+                "verification" in (message.embeds[0].title or "").lower()):
+            logger.info(f"Recorded existing verification panel {message.id} in guild {payload.guild_id}")
+            self.record_panel(payload.guild_id, message.id)
+            return True
+
+        self.non_panel_message_ids[payload.message_id] = None
+        if len(self.non_panel_message_ids) > NEGATIVE_CACHE_SIZE:
+            del self.non_panel_message_ids[next(iter(self.non_panel_message_ids))]
+        return False
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload):
+        if payload.message_id in self.panel_message_ids:
+            self.panel_message_ids.discard(payload.message_id)
+            config_store.remove_from_list(payload.guild_id, 'verification_message_ids', payload.message_id)
 
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload):
@@ -26,7 +241,10 @@ class Verification(commands.Cog):
             return
 
         config = get_server_config(payload.guild_id)
-        if not config:
+        if not config.get("verification_role_id"):
+            return
+
+        if str(payload.emoji) != config.get("verification_emoji", "✅"):
             return
 
         guild = self.bot.get_guild(payload.guild_id)
@@ -41,19 +259,7 @@ class Verification(commands.Cog):
         if not channel:
             return
 
-        try:
-            message = await channel.fetch_message(payload.message_id)
-        except discord.NotFound:
-            return
-
-        if message.author != self.bot.user or not message.embeds:
-            return
-
-        embed = message.embeds[0]
-        if "verification" not in embed.title.lower():
-            return
-
-        if str(payload.emoji) != config.get("verification_emoji", "✅"):
+        if not await self.is_verification_panel(payload, channel):
             return
 
         role = guild.get_role(config["verification_role_id"])
@@ -61,25 +267,7 @@ class Verification(commands.Cog):
             logger.error(f"Verification role {config['verification_role_id']} not found in {guild.name}")
             return
 
-        if role in user.roles:
-            return
-
-        try:
-            await user.add_roles(role, reason="Verification reaction")
-            logger.info(f"Added verification role to {user} in {guild.name}")
-            try:
-                dm_embed = discord.Embed(
-                    title="✅ Verification Complete",
-                    description=f"You have been successfully verified in **{guild.name}**!",
-                    color=0x00ff00
-                )
-                await user.send(embed=dm_embed)
-            except discord.Forbidden:
-                pass
-        except discord.Forbidden:
-            logger.error(f"Missing permissions to add roles in {guild.name}")
-        except Exception as e:
-            logger.error(f"Error adding role: {e}")
+        self.enqueue_role_change(guild.id, user.id, True, role in user.roles)
 
     @commands.Cog.listener()
     async def on_raw_reaction_remove(self, payload):
@@ -87,7 +275,10 @@ class Verification(commands.Cog):
             return
 
         config = get_server_config(payload.guild_id)
-        if not config:
+        if not config.get("verification_role_id"):
+            return
+
+        if str(payload.emoji) != config.get("verification_emoji", "✅"):
             return
 
         guild = self.bot.get_guild(payload.guild_id)
@@ -102,19 +293,7 @@ class Verification(commands.Cog):
         if not channel:
             return
 
-        try:
-            message = await channel.fetch_message(payload.message_id)
-        except discord.NotFound:
-            return
-
-        if message.author != self.bot.user or not message.embeds:
-            return
-
-        embed = message.embeds[0]
-        if "verification" not in embed.title.lower():
-            return
-
-        if str(payload.emoji) != config.get("verification_emoji", "✅"):
+        if not await self.is_verification_panel(payload, channel):
             return
 
         role = guild.get_role(config["verification_role_id"])
@@ -122,16 +301,7 @@ class Verification(commands.Cog):
             logger.error(f"Verification role {config['verification_role_id']} not found in {guild.name}")
             return
 
-        if role not in user.roles:
-            return
-
-        try:
-            await user.remove_roles(role, reason="Verification reaction removed")
-            logger.info(f"Removed verification role from {user} in {guild.name}")
-        except discord.Forbidden:
-            logger.error(f"Missing permissions to remove roles in {guild.name}")
-        except Exception as e:
-            logger.error(f"Error removing role: {e}")
+        self.enqueue_role_change(guild.id, user.id, False, role in user.roles)
 
     @app_commands.command(name="verification", description="Send verification message with reaction")
     @app_commands.describe(channel="Channel to send verification message (optional)")
@@ -173,6 +343,7 @@ class Verification(commands.Cog):
         )
 
         message = await channel.send(embed=embed)
+        self.record_panel(interaction.guild.id, message.id)
         await message.add_reaction(config.get('verification_emoji', '✅'))
         await interaction.response.send_message(f"✅ Verification message sent in {channel.mention}.", ephemeral=True)
 
@@ -185,16 +356,7 @@ class Verification(commands.Cog):
             return
 
         try:
-            with open("config.json", "r") as f:
-                data = json.load(f)
-            guild_id = str(interaction.guild.id)
-            if "servers" not in data:
-                data["servers"] = {}
-            if guild_id not in data["servers"]:
-                data["servers"][guild_id] = {}
-            data["servers"][guild_id]["verification_role_id"] = role.id
-            with open("config.json", "w") as f:
-                json.dump(data, f, indent=2)
+            config_store.set(interaction.guild.id, "verification_role_id", role.id)
             await interaction.response.send_message(f"✅ Set verification role to {role.mention}", ephemeral=True)
         except Exception as e:
             logger.error(f"Error setting verification role: {e}")
@@ -209,16 +371,7 @@ class Verification(commands.Cog):
             await test_message.add_reaction(emoji)
             await test_message.delete()
 
-            with open("config.json", "r") as f:
-                data = json.load(f)
-            guild_id = str(interaction.guild.id)
-            if "servers" not in data:
-                data["servers"] = {}
-            if guild_id not in data["servers"]:
-                data["servers"][guild_id] = {}
-            data["servers"][guild_id]["verification_emoji"] = emoji
-            with open("config.json", "w") as f:
-                json.dump(data, f, indent=2)
+            config_store.set(interaction.guild.id, "verification_emoji", emoji)
 
             await interaction.response.send_message(f"✅ Set verification emoji to {emoji}", ephemeral=True)
         except discord.HTTPException:
@@ -227,5 +380,22 @@ class Verification(commands.Cog):
             logger.error(f"Error setting verification emoji: {e}")
             await interaction.response.send_message("❌ Failed to set verification emoji.", ephemeral=True)
 
+    @app_commands.command(name="verification-stats", description="Show verification role queue statistics")
+    @app_commands.default_permissions(manage_roles=True)
+    async def verification_stats(self, interaction: discord.Interaction):
+        metrics = self.metrics
+        average, p95 = metrics.latency_summary()
+        guild_queue = self.role_queues.get(interaction.guild.id)
+
+        embed = discord.Embed(title="📊 Verification Queue", color=0x3498db)
+        embed.add_field(name="Pending (this server)", value=str(len(guild_queue.pending) if guild_queue else 0), inline=True)
+        embed.add_field(name="Pending (all servers)", value=str(self.queue_depth()), inline=True)
+        embed.add_field(name="Pending DMs", value=str(self.dm_queue.qsize()), inline=True)
+        embed.add_field(name="Role changes", value=f"{metrics.applied} applied • {metrics.skipped} skipped • {metrics.failed} failed", inline=False)
+        embed.add_field(name="Deduplicated toggles", value=str(metrics.deduplicated), inline=True)
+        embed.add_field(name="DMs", value=f"{metrics.dms_sent} sent • {metrics.dms_dropped} dropped", inline=True)
+        embed.add_field(name="Latency", value=f"avg {average:.2f}s • p95 {p95:.2f}s", inline=True)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
 async def setup(bot):
     await bot.add_cog(Verification(bot))
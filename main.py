@@ -2,7 +2,6 @@ import discord
 from discord.ext import commands
 import asyncio
 import logging
-import json
 import os
 import signal
 import sys
@@ -10,6 +9,9 @@ import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
+from utils.config_store import config_store
+from utils.http_client import create_http_session
+from utils.permissions import permission_resolver
 
 # Set up logging
 logging.basicConfig(
@@ -22,25 +24,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Load configuration
-def load_config():
-    try:
-        with open('config.json', 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        logger.error("config.json not found. Creating default config.")
-        default_config = {
-            "verification_role_id": 1020374565190389767,
-            "ticket_category_id": None,
-            "staff_role_ids": [],
-            "verification_emoji": "✅"
-        }
-        with open('config.json', 'w') as f:
-            json.dump(default_config, f, indent=2)
-        return default_config
-
-config = load_config()
-
 # Bot setup with intents
 intents = discord.Intents.default()
 intents.message_content = True
@@ -55,8 +38,21 @@ class DiscordBot(commands.Bot):
             intents=intents,
             help_command=None
         )
+        self.http_session = None
         
     async def setup_hook(self):
+        # Load configuration once; cogs read it from memory afterwards
+        config_store.load()
+        self.config_store = config_store
+
+        # Shared HTTP client for external APIs (status.cfx.re, Tebex, ...)
+        self.http_session = create_http_session()
+
+        # Keep the cached staff/moderator role sets in sync with member roles
+        self.add_listener(permission_resolver.on_member_update)
+        self.add_listener(permission_resolver.on_member_remove)
+        self.add_listener(permission_resolver.on_guild_role_delete)
+
         # Load cogs
         await self.load_extension('cogs.tickets')
         await self.load_extension('cogs.verification')
@@ -164,6 +160,9 @@ class DiscordBot(commands.Bot):
     async def close(self):
         """Override close method to send notification before shutdown"""
         await self.send_shutdown_notification()
+        await config_store.close()
+        if self.http_session and not self.http_session.closed:
+            await self.http_session.close()
         await super().close()
     
     async def on_command_error(self, ctx, error):
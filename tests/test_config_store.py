@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+from utils.config_store import ConfigStore, SQLiteBackend
+
+
+def write_config(path, servers):
+    path.write_text(json.dumps({"servers": servers}))
+
+
+def open_backend(tmp_path):
+    return SQLiteBackend(str(tmp_path / "config.db"), import_from=str(tmp_path / "config.json"))
+
+
+@pytest.mark.parametrize("servers", [{}, {"1": {}}])
+def test_sqlite_import_of_an_empty_config(tmp_path, servers):
+    write_config(tmp_path / "config.json", servers)
+
+    backend = open_backend(tmp_path)
+    assert backend.load() == {"servers": servers}
+    assert backend.load() == {"servers": {}}
+    backend.close()
+
+
+def test_sqlite_import_of_invalid_json_is_retried(tmp_path):
+    (tmp_path / "config.json").write_text("{not json")
+    backend = open_backend(tmp_path)
+    assert backend.load() == {"servers": {}}
+
+    write_config(tmp_path / "config.json", {"1": {"a": 1}})
+    assert backend.load() == {"servers": {"1": {"a": 1}}}
+    backend.close()
+
+
+def test_sqlite_imports_config_json_only_once(tmp_path):
+    write_config(tmp_path / "config.json", {"1": {"welcome_channel_id": 5}})
+
+    store = ConfigStore(open_backend(tmp_path))
+    store.load()
+    assert store.get(1, "welcome_channel_id") == 5
+    store.unset(1, "welcome_channel_id")
+    store.backend.close()
+
+    backend = open_backend(tmp_path)
+    assert backend.load() == {"servers": {}}
+    backend.close()
+
+
+def test_sqlite_database_filled_before_import_marker_keeps_its_rows(tmp_path):
+    backend = open_backend(tmp_path)
+    backend.conn.execute("INSERT INTO guild_settings VALUES ('1', 'a', '2')")
+    backend.conn.commit()
+    write_config(tmp_path / "config.json", {"1": {"a": 1}})
+
+    assert backend.load() == {"servers": {"1": {"a": 2}}}
+    backend.close()
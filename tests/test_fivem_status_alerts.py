@@ -0,0 +1,47 @@
+import asyncio
+
+from cogs import fivem_status
+from cogs.fivem_status import FiveMStatus
+
+
+def load_cog(path):
+    cog = FiveMStatus(bot=None)
+    cog.history.path = str(path)
+
+    asyncio.run(cog.load_history())
+    return cog
+
+
+def detect(cog, monkeypatch, status, now):
+    monkeypatch.setattr(fivem_status.time, "monotonic", lambda: now)
+    return cog.detect_alert_changes({"🎮 FiveM": status})
+
+
+def test_change_debouncing_at_shutdown_is_alerted_after_restart(tmp_path, monkeypatch):
+    path = tmp_path / "history.json"
+    cog = load_cog(path)
+    cog.history.record({"🎮 FiveM": "🟢 Operativo"})
+    assert detect(cog, monkeypatch, "🟢 Operativo", 0) == []
+    cog.history.record({"🎮 FiveM": "🔴 Falla Mayor"})
+    assert detect(cog, monkeypatch, "🔴 Falla Mayor", 10) == []
+    asyncio.run(cog.history.flush())
+
+    restarted = load_cog(path)
+    assert restarted.history.current["🎮 FiveM"] == "🔴 Falla Mayor"
+    assert detect(restarted, monkeypatch, "🔴 Falla Mayor", 1000) == []
+    assert detect(restarted, monkeypatch, "🔴 Falla Mayor", 1000 + fivem_status.ALERT_DEBOUNCE) == [
+        ("🎮 FiveM", "🟢 Operativo", "🔴 Falla Mayor")
+    ]
+
+
+def test_announced_change_is_not_repeated_after_restart(tmp_path, monkeypatch):
+    path = tmp_path / "history.json"
+    cog = load_cog(path)
+    detect(cog, monkeypatch, "🟢 Operativo", 0)
+    detect(cog, monkeypatch, "🔴 Falla Mayor", 10)
+    assert detect(cog, monkeypatch, "🔴 Falla Mayor", 10 + fivem_status.ALERT_DEBOUNCE)
+    asyncio.run(cog.history.flush())
+
+    restarted = load_cog(path)
+    assert detect(restarted, monkeypatch, "🔴 Falla Mayor", 0) == []
+    assert detect(restarted, monkeypatch, "🔴 Falla Mayor", 10 * fivem_status.ALERT_DEBOUNCE) == []
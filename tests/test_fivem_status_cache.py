@@ -0,0 +1,60 @@
+import asyncio
+
+from cogs.fivem_status import FiveMStatus, StatusSnapshot
+
+
+def make_cog(responses):
+    cog = FiveMStatus(bot=None)
+    calls = []
+
+    async def request_status(url, source, snapshot):
+        calls.append(source)
+        return responses.pop(0) if responses else None
+
+    cog._request_status = request_status
+    return cog, calls
+
+
+def test_failure_is_cached_for_the_ttl():
+    cog, calls = make_cog([])
+
+    async def main():
+        assert await cog.fetch_fivem_status() == {}
+        assert await cog.fetch_fivem_status() == {}
+
+    asyncio.run(main())
+    assert calls == ["json", "html"]
+
+
+def test_stale_snapshot_is_served_while_upstream_fails():
+    cog, calls = make_cog([])
+    data = {"🎮 FiveM": "🟢 Operativo"}
+    cog.snapshot = StatusSnapshot(data, None, None, 1, "json")
+    cog.snapshot.fetched_at -= 3600
+
+    async def main():
+        first = await cog.fetch_fivem_status()
+        second = await cog.fetch_fivem_status()
+        monitor = await cog.fetch_fivem_status(max_age=0, allow_stale=False)
+        return first, second, monitor
+
+    first, second, monitor = asyncio.run(main())
+    assert first is data and second is data
+    assert cog.snapshot.stale
+    assert monitor == {}
+    # One refresh for both commands, another for the monitor
+    assert calls == ["json", "html", "json", "html"]
+
+
+def test_success_clears_the_failure():
+    data = {"🎮 FiveM": "🟢 Operativo"}
+    cog, calls = make_cog([None, None, (data, "json", None, None)])
+
+    async def main():
+        assert await cog.fetch_fivem_status() == {}
+        cog.last_failure -= 3600
+        return await cog.fetch_fivem_status()
+
+    assert asyncio.run(main()) == data
+    assert cog.last_failure is None
+    assert not cog.snapshot.stale
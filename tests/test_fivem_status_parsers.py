@@ -0,0 +1,123 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from cogs.fivem_status import FiveMStatus, OVERALL_STATUS, SERVICES
+
+FIXTURES = Path(__file__).parent / "fixtures" / "fivem_status"
+
+
+@pytest.fixture
+def cog():
+    return FiveMStatus(bot=None)
+
+
+@pytest.fixture
+def summary():
+    return json.loads((FIXTURES / "summary.json").read_text(encoding="utf-8"))
+
+
+@pytest.fixture
+def status_page():
+    return (FIXTURES / "status_page.html").read_text(encoding="utf-8")
+
+
+def test_summary_maps_known_components(cog, summary):
+    status = cog.parse_status_summary(summary)
+
+    assert status["🎮 FiveM"] == "🟢 Operativo"
+    assert status["🤠 RedM"] == "🟡 Rendimiento Degradado"
+    assert status["🖥️ FXServer"] == "🟠 Falla Parcial"
+    assert status["🎯 Game Services"] == "🟠 Falla Parcial"
+    assert status["🔗 CnL"] == "🔴 Falla Mayor"
+    assert status["📋 Policy"] == "🔧 Mantenimiento"
+    assert status["📋 Server List"] == "🟢 Operativo"
+
+
+def test_summary_normalizes_component_names(cog, summary):
+    status = cog.parse_status_summary(summary)
+
+    # " Web Services " and "\"Runtime\"" in the payload
+    assert status["🌐 Web Services"] == "🟢 Operativo"
+    assert status["⚡ Runtime"] == "🟢 Operativo"
+
+
+def test_summary_keeps_first_duplicate_component(cog, summary):
+    assert cog.parse_status_summary(summary)["🎮 FiveM"] == "🟢 Operativo"
+
+
+def test_summary_missing_component(cog, summary):
+    assert cog.parse_status_summary(summary)["🚪 Portal"] == "❓ No disponible"
+
+
+def test_summary_unknown_component_status(cog, summary):
+    assert cog.parse_status_summary(summary)["🆔 IDMS"] == "❓ Desconocido"
+
+
+def test_summary_reports_every_service(cog, summary):
+    status = cog.parse_status_summary(summary)
+
+    assert set(status) == {service[0] for service in SERVICES} | {"overall"}
+
+
+@pytest.mark.parametrize("indicator, expected", [
+    ("none", "🟢 Todos los sistemas operativos"),
+    ("minor", "🟡 Algunos sistemas con problemas"),
+    ("major", "🔴 Falla mayor del servicio"),
+    ("critical", "🔴 Falla mayor del servicio"),
+    ("maintenance", "🔧 Mantenimiento en curso"),
+    ("something_new", "❓ Estado general desconocido"),
+    (None, "❓ Estado general desconocido"),
+])
+def test_summary_overall_indicator(cog, summary, indicator, expected):
+    summary["status"]["indicator"] = indicator
+
+    assert cog.parse_status_summary(summary)["overall"] == expected
+
+
+def test_overall_table_has_no_untested_indicator():
+    assert set(OVERALL_STATUS) == {"none", "minor", "major", "critical", "maintenance"}
+
+
+def test_summary_empty_payload(cog):
+    status = cog.parse_status_summary({})
+
+    assert all(status[service[0]] == "❓ No disponible" for service in SERVICES)
+    assert status["overall"] == "❓ Estado general desconocido"
+
+
+def test_html_fallback_maps_components(cog, status_page):
+    status = cog.parse_status_content(status_page)
+
+    assert status["🎮 FiveM"] == "🟢 Operativo"
+    assert status["🤠 RedM"] == "🟡 Rendimiento Degradado"
+    assert status["🖥️ FXServer"] == "🟠 Falla Parcial"
+    assert status["🔗 CnL"] == "🔴 Falla Mayor"
+    assert status["📋 Policy"] == "🔧 Mantenimiento"
+    assert status["⚡ Runtime"] == "🟢 Operativo"
+    assert status["🆔 IDMS"] == "🟢 Operativo"
+    assert status["overall"] == "🟡 Algunos sistemas con problemas"
+
+
+def test_html_fallback_missing_component(cog, status_page):
+    assert cog.parse_status_content(status_page)["🚪 Portal"] == "❓ No disponible"
+
+
+@pytest.mark.parametrize("banner, expected", [
+    ("All Systems Operational", "🟢 Todos los sistemas operativos"),
+    ("Some Systems Experiencing Issues", "🟡 Algunos sistemas con problemas"),
+    ("Major Service Outage", "🔴 Falla mayor del servicio"),
+    ("Scheduled Maintenance", "❓ Estado general desconocido"),
+])
+def test_html_fallback_overall(cog, banner, expected):
+    assert cog.parse_status_content(f"<span class=\"status\">{banner}</span>")["overall"] == expected
+
+
+def test_json_and_html_agree(cog, summary, status_page):
+    from_json = cog.parse_status_summary(summary)
+    from_html = cog.parse_status_content(status_page)
+
+    # Both fixtures describe the same incident
+    for service in ("🎮 FiveM", "🤠 RedM", "🖥️ FXServer", "🔗 CnL", "📋 Policy", "🔑 Keymaster"):
+        assert from_json[service] == from_html[service]
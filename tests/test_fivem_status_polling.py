@@ -0,0 +1,41 @@
+import pytest
+
+from cogs import fivem_status
+from cogs.fivem_status import FiveMStatus, POLL_INCIDENT_INTERVAL, POLL_INTERVAL, POLL_MAX_BACKOFF
+
+
+@pytest.fixture
+def cog(monkeypatch):
+    monkeypatch.setattr(fivem_status.random, "uniform", lambda low, high: 1.0)
+    return FiveMStatus(bot=None)
+
+
+@pytest.mark.parametrize("status", [
+    "🟡 Rendimiento Degradado", "🟠 Falla Parcial", "🔴 Falla Mayor", "🔧 Mantenimiento",
+])
+def test_incident_polls_fast(cog, status):
+    cog.history.record({"🎮 FiveM": "🟢 Operativo", "🤠 RedM": status})
+
+    assert cog.next_poll_interval() == POLL_INCIDENT_INTERVAL
+
+
+@pytest.mark.parametrize("status", ["❓ No disponible", "❓ Desconocido"])
+def test_unknown_status_is_not_an_incident(cog, status):
+    cog.history.record({"🎮 FiveM": "🟢 Operativo", "🚪 Portal": status})
+
+    assert cog.next_poll_interval() == POLL_INTERVAL
+
+
+def test_stable_status_polls_slowly(cog):
+    cog.history.record({"🎮 FiveM": "🟢 Operativo", "🚪 Portal": "❓ No disponible"}, timestamp=0)
+
+    assert cog.next_poll_interval() == fivem_status.POLL_STABLE_INTERVAL
+
+
+def test_failures_back_off_up_to_the_limit(cog):
+    cog.history.record({"🎮 FiveM": "🟢 Operativo"})
+    cog.poll_failures = 2
+    assert cog.next_poll_interval() == POLL_INTERVAL * 4
+
+    cog.poll_failures = 10
+    assert cog.next_poll_interval() == POLL_MAX_BACKOFF
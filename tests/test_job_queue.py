@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+import pytest
+
+from utils.job_queue import JobQueue
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_loaded_jobs_wait_for_start(tmp_path):
+    path = tmp_path / "jobs.json"
+    path.write_text(json.dumps({
+        "a": {"key": "a", "payload": {}, "state": {}, "attempts": 0, "not_before": 0}
+    }))
+    handled = []
+
+    async def handler(job):
+        handled.append(job["key"])
+
+    async def main():
+        queue = JobQueue(str(path), handler)
+        queue.load()
+        await asyncio.sleep(0.05)
+        assert handled == [] and "a" in queue
+        queue.start()
+        await asyncio.sleep(0.05)
+        await queue.stop()
+        return queue
+
+    queue = run(main())
+    assert handled == ["a"]
+    assert "a" not in queue
+    assert json.loads(path.read_text()) == {}
+
+
+def test_job_enqueued_before_start_runs_once(tmp_path):
+    handled = []
+
+    async def handler(job):
+        handled.append(job["key"])
+
+    async def main():
+        queue = JobQueue(str(tmp_path / "jobs.json"), handler)
+        queue.enqueue("a", {})
+        queue.start()
+        queue.start()
+        await asyncio.sleep(0.05)
+        await queue.stop()
+
+    run(main())
+    assert handled == ["a"]
+
+
+def test_failed_job_is_retried_then_abandoned(tmp_path):
+    attempts = []
+    abandoned = []
+
+    async def handler(job):
+        attempts.append(job["attempts"])
+        raise RuntimeError("guild not cached")
+
+    async def on_give_up(job):
+        abandoned.append(job["key"])
+
+    async def main():
+        queue = JobQueue(str(tmp_path / "jobs.json"), handler, max_attempts=3,
+                         retry_delay=0.01, on_give_up=on_give_up)
+        queue.start()
+        queue.enqueue("a", {})
+        await asyncio.sleep(0.2)
+        await queue.stop()
+
+    run(main())
+    assert attempts == [1, 2, 3]
+    assert abandoned == ["a"]
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_duplicate_keys_are_rejected(tmp_path, workers):
+    async def handler(job):
+        await asyncio.sleep(0.01)
+
+    async def main():
+        queue = JobQueue(str(tmp_path / "jobs.json"), handler, workers=workers)
+        assert queue.enqueue("a", {})
+        assert not queue.enqueue("a", {})
+        await queue.stop()
+
+    run(main())
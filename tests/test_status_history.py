@@ -0,0 +1,43 @@
+from utils.status_history import StatusHistory
+
+SERVICES = ["🎮 FiveM", "🚪 Portal"]
+
+
+def make_history():
+    history = StatusHistory(SERVICES, capacity=16)
+    history.record({"🎮 FiveM": "🟢 Operativo", "🚪 Portal": "🟢 Operativo"}, timestamp=0)
+    history.record({"🎮 FiveM": "🔴 Falla Mayor", "🚪 Portal": "❓ No disponible"}, timestamp=600)
+    history.record({"🎮 FiveM": "🟢 Operativo", "🚪 Portal": "❓ No disponible"}, timestamp=900)
+    return history
+
+
+def test_uptime_counts_known_time_only():
+    uptime = make_history().uptime(0, 1200)
+
+    assert uptime["🎮 FiveM"] == 900 / 1200
+    # 600 s operational, 600 s unknown
+    assert uptime["🚪 Portal"] == 1.0
+
+
+def test_uptime_skips_services_never_known():
+    history = StatusHistory(SERVICES, capacity=16)
+    history.record({"🚪 Portal": "❓ No disponible"}, timestamp=0)
+
+    assert history.uptime(0, 100) == {}
+
+
+def test_incidents_ignore_unknown_statuses():
+    incidents = make_history().incidents(0, 1200)
+
+    assert incidents == [("🎮 FiveM", "🔴 Falla Mayor", 600, 900, False)]
+
+
+def test_ring_buffer_keeps_newest_transitions():
+    history = StatusHistory(SERVICES, capacity=4)
+    for step in range(6):
+        status = "🟢 Operativo" if step % 2 == 0 else "🟡 Rendimiento Degradado"
+        history.record({"🎮 FiveM": status}, timestamp=step)
+
+    assert [timestamp for timestamp, _, _ in history] == [2, 3, 4, 5]
+    assert history.oldest() == 2
+    assert history.latest() == 5
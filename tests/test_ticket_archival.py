@@ -0,0 +1,91 @@
+import asyncio
+import io
+from types import SimpleNamespace
+
+import discord
+import pytest
+
+from cogs import tickets
+from cogs.tickets import Tickets
+
+
+class FakeBot:
+    def __init__(self, guilds=None):
+        self.guilds_by_id = guilds or {}
+
+    def add_view(self, view):
+        pass
+
+    def get_guild(self, guild_id):
+        return self.guilds_by_id.get(guild_id)
+
+
+class FakeGuild:
+    unavailable = False
+
+    def get_channel(self, channel_id):
+        return None
+
+
+def archive(bot):
+    async def main():
+        cog = Tickets(bot)
+        job = {'key': '2', 'payload': {'guild_id': 1, 'channel_id': 2}, 'state': {}}
+        await cog.archive_ticket(job)
+
+    asyncio.run(main())
+
+
+def test_archival_is_retried_while_the_guild_is_not_cached():
+    with pytest.raises(RuntimeError):
+        archive(FakeBot())
+
+
+def test_archival_of_a_deleted_channel_is_done():
+    archive(FakeBot({1: FakeGuild()}))
+
+
+class FakeResponse:
+    def __init__(self, status):
+        self.status = status
+        self.reason = "error"
+
+
+class FakeCreator:
+    id = 7
+    mention = "<@7>"
+
+    def __init__(self, status):
+        self.status = status
+
+    async def send(self, **kwargs):
+        raise discord.HTTPException(FakeResponse(self.status), "error")
+
+
+def send_dm(monkeypatch, status):
+    creator = FakeCreator(status)
+
+    async def resolve(bot, guild, creator_id):
+        return creator
+
+    async def transcript(channel, user, **kwargs):
+        return io.BytesIO(b"transcript"), "transcript.txt"
+
+    monkeypatch.setattr(tickets, "resolve_ticket_creator", resolve)
+    monkeypatch.setattr(tickets, "create_transcript", transcript)
+    channel = SimpleNamespace(name="ticket-x", guild=SimpleNamespace(id=1, name="Guild", get_channel=lambda _: None))
+    payload = {'creator_id': 7, 'closed_by_name': "staff"}
+
+    async def main():
+        await Tickets(FakeBot()).send_transcripts(channel, payload, {})
+
+    asyncio.run(main())
+
+
+def test_permanent_dm_error_does_not_fail_the_job(monkeypatch):
+    send_dm(monkeypatch, 413)
+
+
+def test_transient_dm_error_is_retried(monkeypatch):
+    with pytest.raises(discord.HTTPException):
+        send_dm(monkeypatch, 503)
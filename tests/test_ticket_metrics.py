@@ -0,0 +1,69 @@
+from utils.ticket_metrics import TicketMetrics, histogram_percentile
+
+
+def make_metrics(tmp_path):
+    metrics = TicketMetrics(str(tmp_path / "ticket_metrics.json"))
+    metrics.created(1, 10, 100, timestamp=0)
+    metrics.created(2, 20, 200, timestamp=0)
+    metrics.first_response(10, timestamp=120)
+    metrics.closed(10, timestamp=3000)
+    return metrics
+
+
+def family(sample: str) -> str:
+    name = sample.split("{", 1)[0]
+    for suffix in ("_bucket", "_sum", "_count"):
+        if name.startswith("ticket_") and name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+def test_prometheus_families_are_contiguous(tmp_path):
+    lines = make_metrics(tmp_path).prometheus().splitlines()
+
+    families = []
+    for line in lines:
+        if line.startswith("# TYPE "):
+            families.append(line.split()[2])
+        else:
+            assert family(line) == families[-1], line
+    assert len(families) == len(set(families))
+    assert families == [
+        "tickets_open", "tickets_created_total", "tickets_closed_total",
+        "ticket_first_response_seconds", "ticket_resolution_seconds",
+    ]
+
+
+def test_prometheus_samples(tmp_path):
+    text = make_metrics(tmp_path).prometheus()
+
+    assert 'tickets_open{guild="1"} 0' in text
+    assert 'tickets_open{guild="2"} 1' in text
+    assert 'tickets_closed_total{guild="1"} 1' in text
+    assert 'ticket_first_response_seconds_bucket{guild="1",le="300"} 1' in text
+    assert 'ticket_resolution_seconds_count{guild="1"} 1' in text
+
+
+def test_histogram_percentile():
+    assert histogram_percentile([0] * 12, 0.5) is None
+    assert histogram_percentile([1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0], 0.5) == 60
+    assert histogram_percentile([0] * 11 + [1], 0.95) == float("inf")
+
+
+def test_reconcile_closes_tickets_deleted_while_offline(tmp_path):
+    metrics = make_metrics(tmp_path)
+    resolution = list(metrics.guilds["2"]["resolution"])
+
+    assert metrics.reconcile(lambda channel_id: False) == 1
+    assert metrics.open == {}
+    assert metrics.open_count(2) == 0
+    # The close time is unknown, so no resolution is recorded
+    assert metrics.guilds["2"]["resolution"] == resolution
+    assert metrics.reconcile(lambda channel_id: False) == 0
+
+
+def test_reconcile_keeps_open_tickets(tmp_path):
+    metrics = make_metrics(tmp_path)
+
+    assert metrics.reconcile(lambda channel_id: channel_id == 20) == 0
+    assert metrics.open_count(2) == 1
@@ -0,0 +1,86 @@
+import asyncio
+
+from utils.transcript_log import TranscriptLog
+
+
+def entry(content):
+    return {'content': content}
+
+
+def test_records_are_written_off_the_loop_on_flush(tmp_path):
+    log = TranscriptLog(str(tmp_path / "logs"))
+
+    async def main():
+        log.start(1)
+        log.add(1, 10, entry("hola"))
+        assert not (tmp_path / "logs" / "1.jsonl").exists()
+        assert await log.flush()
+
+    asyncio.run(main())
+    assert list(log.entries(1)) == [entry("hola")]
+
+
+def test_entries_apply_edits_and_deletions(tmp_path):
+    log = TranscriptLog(str(tmp_path / "logs"))
+
+    async def main():
+        log.start(1)
+        log.add(1, 10, entry("a"))
+        log.add(1, 11, entry("b"))
+        log.add(1, 12, entry("c"))
+        log.edit(1, 10, entry("a (editado)"))
+        log.delete(1, 11)
+        await log.flush()
+
+    asyncio.run(main())
+    assert list(log.entries(1)) == [entry("a (editado)"), entry("c")]
+    assert list(log.entries(1, up_to=11)) == [entry("a (editado)")]
+
+
+def test_untracked_channels_are_ignored(tmp_path):
+    log = TranscriptLog(str(tmp_path / "logs"))
+
+    async def main():
+        log.add(2, 10, entry("x"))
+        await log.flush()
+
+    asyncio.run(main())
+    assert not (tmp_path / "logs" / "2.jsonl").exists()
+    assert log.last_id(2) is None
+
+
+def test_load_restores_last_ids(tmp_path):
+    directory = str(tmp_path / "logs")
+
+    async def write():
+        log = TranscriptLog(directory)
+        log.start(1)
+        log.add(1, 12, entry("b"))
+        log.add(1, 10, entry("a"))
+        await log.close()
+
+    asyncio.run(write())
+    with (tmp_path / "logs" / "1.jsonl").open("a") as f:
+        # Torn record left by a crash
+        f.write('{"op": "create", "id": 99')
+
+    log = TranscriptLog(directory)
+    log.load()
+    assert log.exists(1)
+    assert log.last_id(1) == 12
+
+
+def test_discard_removes_the_log(tmp_path):
+    log = TranscriptLog(str(tmp_path / "logs"))
+
+    async def main():
+        log.start(1)
+        log.add(1, 10, entry("a"))
+        await log.flush()
+        log.add(1, 11, entry("b"))
+        await log.discard(1)
+        await log.close()
+
+    asyncio.run(main())
+    assert not (tmp_path / "logs" / "1.jsonl").exists()
+    assert not log.exists(1)
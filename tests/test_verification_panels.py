@@ -0,0 +1,72 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import discord
+import pytest
+
+from cogs.verification import Verification
+from utils.config_store import config_store
+
+GUILD_ID = 4242
+
+
+class FakeChannel:
+    def __init__(self):
+        self.fetches = 0
+
+    async def fetch_message(self, message_id):
+        self.fetches += 1
+        raise discord.NotFound(SimpleNamespace(status=404, reason="Not Found"), "Unknown Message")
+
+
+@pytest.fixture
+def cog(monkeypatch):
+    monkeypatch.setitem(config_store.data, 'servers', {})
+    return Verification(bot=None)
+
+
+def payload(message_time):
+    return SimpleNamespace(guild_id=GUILD_ID, message_id=discord.utils.time_snowflake(message_time))
+
+
+def check(cog, message_payload, channel):
+    return asyncio.run(cog.is_verification_panel(message_payload, channel))
+
+
+def test_messages_after_the_cutoff_are_never_fetched(cog):
+    cutoff = time.time() - 3600
+    config_store.servers[str(GUILD_ID)] = {'verification_legacy_cutoff': cutoff}
+    channel = FakeChannel()
+
+    new_message = payload(datetime.fromtimestamp(cutoff + 60, timezone.utc))
+    assert not check(cog, new_message, channel)
+    assert channel.fetches == 0
+
+
+def test_guild_without_cutoff_is_never_fetched(cog):
+    channel = FakeChannel()
+
+    assert not check(cog, payload(discord.utils.utcnow()), channel)
+    assert channel.fetches == 0
+
+
+def test_legacy_message_is_fetched_once_per_run(cog):
+    cutoff = time.time()
+    config_store.servers[str(GUILD_ID)] = {'verification_legacy_cutoff': cutoff}
+    channel = FakeChannel()
+    old_message = payload(datetime.fromtimestamp(cutoff - 86400, timezone.utc))
+
+    assert not check(cog, old_message, channel)
+    assert not check(cog, old_message, channel)
+    assert channel.fetches == 1
+
+
+def test_recorded_panel_is_answered_from_memory(cog):
+    channel = FakeChannel()
+    message = payload(discord.utils.utcnow())
+    cog.panel_message_ids.add(message.message_id)
+
+    assert check(cog, message, channel)
+    assert channel.fetches == 0
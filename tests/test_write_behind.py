@@ -0,0 +1,70 @@
+import asyncio
+import threading
+
+from utils.config_store import WriteBehind
+
+
+def test_writes_immediately_outside_the_loop():
+    written = []
+    writer = WriteBehind(lambda: "state", written.append, "test")
+
+    assert writer.schedule()
+    assert written == ["state"]
+
+
+def test_coalesces_mutations_within_the_delay():
+    written = []
+    state = {"value": 0}
+
+    async def main():
+        writer = WriteBehind(lambda: state["value"], written.append, "test", delay=0.01)
+        for value in range(1, 6):
+            state["value"] = value
+            writer.schedule()
+        await writer.close()
+
+    asyncio.run(main())
+    assert written == [5]
+
+
+def test_mutation_during_write_is_not_lost():
+    written = []
+    state = {"value": 1}
+    writing = threading.Event()
+    release = threading.Event()
+
+    def slow_write(data):
+        writing.set()
+        release.wait(1)
+        written.append(data)
+
+    async def main():
+        writer = WriteBehind(lambda: state["value"], slow_write, "test", delay=0.01)
+        writer.schedule()
+        await asyncio.to_thread(writing.wait, 1)
+        state["value"] = 2
+        writer.schedule()
+        release.set()
+        await writer.close()
+
+    asyncio.run(main())
+    assert written == [1, 2]
+
+
+def test_failed_write_stays_dirty():
+    attempts = []
+    restored = []
+
+    def failing_write(data):
+        attempts.append(data)
+        raise OSError("disk full")
+
+    async def main():
+        writer = WriteBehind(lambda: "state", failing_write, "test", delay=0.01, on_error=restored.append)
+        writer.schedule()
+        await asyncio.sleep(0.05)
+        return writer.dirty
+
+    assert asyncio.run(main())
+    assert attempts == ["state"]
+    assert restored == ["state"]
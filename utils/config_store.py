@@ -0,0 +1,419 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONFIG_PATH = 'config.json'
+CONFIG_DB_PATH = 'config.db'
+
+# PRAGMA user_version of a config database that has had config.json imported
+IMPORTED_SCHEMA_VERSION = 1
+
+# Mutations arriving within this window are written to disk together
+FLUSH_DELAY = 0.5
+
+def atomic_write(path: str, payload: str) -> None:
+    """Write payload to path via temp file + fsync + rename.
+
+    Readers always see either the old or the new file, never a truncated one.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.tmp-', dir=directory)
+    try:
+        try:
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+        except FileNotFoundError:
+            os.chmod(tmp_path, 0o644)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+class WriteBehind:
+    """Coalesced, off-loop persistence of one piece of state.
+
+    schedule() marks the state dirty. Inside the event loop the write is
+    deferred by `delay` seconds, so mutations arriving within that window are
+    written together, and performed in a worker thread; outside of a loop it
+    happens immediately. The payload is built on the loop, writes never
+    overlap, and a mutation made while a write is in flight is picked up by
+    the next one. After a failed write the state stays dirty until the next
+    mutation or flush().
+    """
+
+    def __init__(self, payload: Callable[[], Any], write: Callable[[Any], None], name: str,
+                 delay: float = FLUSH_DELAY, on_error: Optional[Callable[[Any], None]] = None):
+        self.payload = payload
+        self.write = write
+        self.name = name
+        self.delay = delay
+        self.on_error = on_error
+        self.dirty = False
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def to_file(cls, path: str, payload: Callable[[], str], name: str, delay: float = FLUSH_DELAY) -> 'WriteBehind':
+        """Write the payload string to path with atomic_write"""
+        return cls(payload, lambda data: atomic_write(path, data), name, delay)
+
+    def schedule(self) -> bool:
+        """Schedule a write. Returns False if an immediate (no loop) write failed"""
+        self.dirty = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return self._write_now()
+
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._write_behind())
+        return True
+
+    async def _write_behind(self) -> None:
+        while self.dirty:
+            await asyncio.sleep(self.delay)
+            if not await self.flush():
+                break
+
+    def _failed(self, data: Any, error: Exception) -> None:
+        self.dirty = True
+        if self.on_error:
+            self.on_error(data)
+        logger.error(f"Error saving {self.name}: {error}")
+
+    async def flush(self) -> bool:
+        """Write pending changes now, off the event loop"""
+        async with self._lock:
+            if not self.dirty:
+                return True
+            # Snapshot on the loop so the payload is consistent
+            data = self.payload()
+            self.dirty = False
+            try:
+                await asyncio.to_thread(self.write, data)
+                return True
+            except Exception as e:
+                self._failed(data, e)
+                return False
+
+    def _write_now(self) -> bool:
+        data = self.payload()
+        self.dirty = False
+        try:
+            self.write(data)
+            return True
+        except Exception as e:
+            self._failed(data, e)
+            return False
+
+    async def close(self) -> None:
+        """Wait for the pending write, then write anything left"""
+        if self._task and not self._task.done():
+            await self._task
+        await self.flush()
+
+def read_json_config(path: str) -> Dict[str, Any]:
+    """Read a config.json file, returning an empty config if it is missing or invalid"""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        logger.error(f"{path} not found, starting with empty config")
+    except json.JSONDecodeError:
+        logger.error(f"Invalid JSON in {path}, starting with empty config")
+    return {}
+
+# A pending change: (guild_id as str, setting key)
+Change = Tuple[str, str]
+
+class JsonBackend:
+    """Stores the whole configuration in config.json (default backend)"""
+
+    name = 'json'
+
+    def __init__(self, path: str = CONFIG_PATH):
+        self.path = path
+
+    def load(self) -> Dict[str, Any]:
+        return read_json_config(self.path)
+
+    def prepare(self, data: Dict[str, Any], changes: Set[Change]) -> str:
+        # The file is rewritten in full, so individual changes don't matter
+        return json.dumps(data, indent=2)
+
+    def write(self, payload: str) -> None:
+        atomic_write(self.path, payload)
+
+    def close(self) -> None:
+        pass
+
+class SQLiteBackend:
+    """Stores guild settings as one SQLite row per (guild, key).
+
+    Only the rows touched since the last flush are written, so the cost of a
+    change doesn't grow with the number of guilds. The database runs in WAL
+    mode. Top-level keys other than "servers" are not stored.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, path: str = CONFIG_DB_PATH, import_from: Optional[str] = CONFIG_PATH):
+        self.path = path
+        self.import_from = import_from
+        # Writes happen in worker threads, serialized by ConfigStore
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS guild_settings ('
+            ' guild_id TEXT NOT NULL,'
+            ' key TEXT NOT NULL,'
+            ' value TEXT NOT NULL,'
+            ' PRIMARY KEY (guild_id, key))'
+        )
+        self.conn.commit()
+
+    def load(self) -> Dict[str, Any]:
+        # user_version records that config.json was imported, so it is imported only once
+        imported = self.conn.execute('PRAGMA user_version').fetchone()[0] >= IMPORTED_SCHEMA_VERSION
+        if not imported and self.conn.execute('SELECT 1 FROM guild_settings LIMIT 1').fetchone():
+            # Database filled before the import was recorded: keep its rows
+            with self.conn:
+                self._mark_imported()
+            imported = True
+        if not imported and self.import_from and os.path.exists(self.import_from):
+            servers = self.import_json(self.import_from)
+            logger.info(f"Imported {len(servers)} server(s) from {self.import_from} into {self.path}")
+            return {'servers': servers}
+
+        servers: Dict[str, Dict[str, Any]] = {}
+        for guild_id, key, value in self.conn.execute('SELECT guild_id, key, value FROM guild_settings'):
+            servers.setdefault(guild_id, {})[key] = json.loads(value)
+        return {'servers': servers}
+
+    def import_json(self, json_path: str) -> Dict[str, Dict[str, Any]]:
+        """Copy every servers[guild_id] entry of a config.json into the database.
+
+        Returns the imported servers and marks the database as imported. An
+        unreadable file is not marked, so it is imported once it is fixed.
+        """
+        try:
+            with open(json_path, 'r') as f:
+                data = json.load(f)
+        except json.JSONDecodeError:
+            logger.error(f"Invalid JSON in {json_path}, not imported")
+            return {}
+        servers = data.get('servers', {})
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO guild_settings (guild_id, key, value) VALUES (?, ?, ?)',
+                [
+                    (guild_id, key, json.dumps(value))
+                    for guild_id, server_config in servers.items()
+                    for key, value in server_config.items()
+                ]
+            )
+            self._mark_imported()
+        return servers
+
+    def _mark_imported(self) -> None:
+        self.conn.execute(f'PRAGMA user_version = {IMPORTED_SCHEMA_VERSION}')
+
+    def prepare(self, data: Dict[str, Any], changes: Set[Change]) -> List[Tuple[str, str, Optional[str]]]:
+        servers = data.get('servers', {})
+        rows = []
+        for guild_id, key in changes:
+            server_config = servers.get(guild_id, {})
+            if key in server_config:
+                rows.append((guild_id, key, json.dumps(server_config[key])))
+            else:
+                rows.append((guild_id, key, None))
+        return rows
+
+    def write(self, rows: List[Tuple[str, str, Optional[str]]]) -> None:
+        with self.conn:
+            for guild_id, key, value in rows:
+                if value is None:
+                    self.conn.execute(
+                        'DELETE FROM guild_settings WHERE guild_id = ? AND key = ?',
+                        (guild_id, key)
+                    )
+                else:
+                    self.conn.execute(
+                        'INSERT INTO guild_settings (guild_id, key, value) VALUES (?, ?, ?) '
+                        'ON CONFLICT (guild_id, key) DO UPDATE SET value = excluded.value',
+                        (guild_id, key, value)
+                    )
+
+    def close(self) -> None:
+        self.conn.close()
+
+class ConfigStore:
+    """Process-wide in-memory copy of the configuration with per-guild lookups.
+
+    Reads are served from memory whatever the backend; the backend only
+    decides how changes are persisted.
+    """
+
+    def __init__(self, backend=None, flush_delay: float = FLUSH_DELAY):
+        self.backend = backend or JsonBackend()
+        self.data: Dict[str, Any] = {'servers': {}}
+        self.loaded = False
+        self._changes: Set[Change] = set()
+        self._writer = WriteBehind(
+            self._take_payload, lambda pending: self.backend.write(pending[1]), 'config',
+            flush_delay, on_error=self._restore_changes
+        )
+        self._listeners: List[Callable[[Optional[int], Iterable[str]], None]] = []
+
+    def add_listener(self, listener: Callable[[Optional[int], Iterable[str]], None]) -> None:
+        """Call listener(guild_id, keys) after every change (guild_id None after a reload)"""
+        self._listeners.append(listener)
+
+    def _notify(self, guild_id: Optional[int], keys: Iterable[str]) -> None:
+        for listener in self._listeners:
+            try:
+                listener(guild_id, keys)
+            except Exception as e:
+                logger.error(f"Error in config change listener: {e}")
+
+    @property
+    def servers(self) -> Dict[str, Dict[str, Any]]:
+        return self.data.setdefault('servers', {})
+
+    def load(self) -> None:
+        """Read the configuration once into memory"""
+        self.data = self.backend.load()
+        self.data.setdefault('servers', {})
+        self.loaded = True
+        self._notify(None, ())
+        logger.info(f"Config loaded for {len(self.servers)} server(s) ({self.backend.name} backend)")
+
+    def get_guild(self, guild_id: int) -> Dict[str, Any]:
+        """Return the settings of a guild (empty dict if not configured).
+
+        The returned dict must be treated as read-only; use the setters below
+        to change it so the change is persisted.
+        """
+        return self.servers.get(str(guild_id)) or {}
+
+    def has_guild(self, guild_id: int) -> bool:
+        return str(guild_id) in self.servers
+
+    def get(self, guild_id: int, key: str, default: Any = None) -> Any:
+        return self.get_guild(guild_id).get(key, default)
+
+    def guilds(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Iterate over (guild_id, settings) for every configured guild"""
+        for guild_id_str, server_config in list(self.servers.items()):
+            yield int(guild_id_str), server_config
+
+    def _guild_for_update(self, guild_id: int) -> Dict[str, Any]:
+        return self.servers.setdefault(str(guild_id), {})
+
+    def _changed(self, guild_id: int, keys: Iterable[str]) -> bool:
+        keys = tuple(keys)
+        self._changes.update((str(guild_id), key) for key in keys)
+        self._notify(guild_id, keys)
+        return self.save()
+
+    def set(self, guild_id: int, key: str, value: Any) -> bool:
+        """Set a guild setting and persist it"""
+        self._guild_for_update(guild_id)[key] = value
+        return self._changed(guild_id, (key,))
+
+    def update(self, guild_id: int, **values: Any) -> bool:
+        """Set several guild settings at once and persist them"""
+        self._guild_for_update(guild_id).update(values)
+        return self._changed(guild_id, values)
+
+    def unset(self, guild_id: int, *keys: str) -> bool:
+        """Remove guild settings. Returns False if none of the keys existed"""
+        server_config = self.servers.get(str(guild_id))
+        if not server_config:
+            return False
+        removed = [key for key in keys if key in server_config]
+        if not removed:
+            return False
+        for key in removed:
+            del server_config[key]
+        self._changed(guild_id, removed)
+        return True
+
+    def add_to_list(self, guild_id: int, key: str, value: Any) -> bool:
+        """Append value to a list setting. Returns False if it was already there"""
+        values = self._guild_for_update(guild_id).setdefault(key, [])
+        if value in values:
+            return False
+        values.append(value)
+        self._changed(guild_id, (key,))
+        return True
+
+    def remove_from_list(self, guild_id: int, key: str, value: Any) -> bool:
+        """Remove value from a list setting. Returns False if it was not there"""
+        values = self.get_guild(guild_id).get(key)
+        if not values or value not in values:
+            return False
+        values.remove(value)
+        self._changed(guild_id, (key,))
+        return True
+
+    def save(self) -> bool:
+        """Schedule a write of pending changes (see WriteBehind)"""
+        return self._writer.schedule()
+
+    def _take_payload(self) -> Tuple[Set[Change], Any]:
+        changes, self._changes = self._changes, set()
+        return changes, self.backend.prepare(self.data, changes)
+
+    def _restore_changes(self, pending: Tuple[Set[Change], Any]) -> None:
+        self._changes |= pending[0]
+
+    async def flush(self) -> bool:
+        """Write pending changes now, off the event loop"""
+        return await self._writer.flush()
+
+    async def close(self) -> None:
+        """Wait for pending writes before shutdown"""
+        await self._writer.close()
+        self.backend.close()
+
+def create_config_store() -> ConfigStore:
+    """Build the store for the backend selected by CONFIG_BACKEND (json or sqlite)"""
+    backend_name = os.getenv('CONFIG_BACKEND', 'json').lower()
+    if backend_name == 'sqlite':
+        return ConfigStore(SQLiteBackend(os.getenv('CONFIG_DB_PATH', CONFIG_DB_PATH)))
+    if backend_name != 'json':
+        logger.warning(f"Unknown CONFIG_BACKEND '{backend_name}', using json")
+    return ConfigStore(JsonBackend())
+
+# Shared instance used by the bot and all cogs
+config_store = create_config_store()
+
+def get_server_config(guild_id: Optional[int]) -> Dict[str, Any]:
+    """Shortcut for config_store.get_guild"""
+    if guild_id is None:
+        return {}
+    return config_store.get_guild(guild_id)
+
+if __name__ == '__main__':
+    # python -m utils.config_store [config.json] [config.db]
+    json_path = sys.argv[1] if len(sys.argv) > 1 else CONFIG_PATH
+    db_path = sys.argv[2] if len(sys.argv) > 2 else CONFIG_DB_PATH
+    backend = SQLiteBackend(db_path, import_from=None)
+    count = len(backend.import_json(json_path))
+    backend.close()
+    print(f"Imported {count} server(s) from {json_path} into {db_path}")
@@ -0,0 +1,58 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (key identifying the job, rate-limit bucket, coroutine factory)
+FanOutJob = Tuple[Hashable, Hashable, Callable[[], Awaitable[object]]]
+
+class FanOutResult:
+    """Outcome of one fan-out job"""
+
+    __slots__ = ('key', 'ok', 'latency', 'error')
+
+    def __init__(self, key: Hashable, ok: bool, latency: float, error: Optional[str] = None):
+        self.key = key
+        self.ok = ok
+        self.latency = latency
+        self.error = error
+
+async def fan_out(jobs: Iterable[FanOutJob], concurrency: int = 10,
+                  timeout: Optional[float] = None) -> List[FanOutResult]:
+    """Run jobs concurrently with bounded parallelism.
+
+    At most `concurrency` jobs run at once and jobs sharing a bucket (e.g. the
+    same channel, which shares a Discord rate limit) run one at a time. Jobs
+    still unfinished after `timeout` seconds are cancelled and reported as
+    timed out, so the whole batch has a bounded duration.
+    """
+    limiter = asyncio.Semaphore(concurrency)
+    bucket_locks: Dict[Hashable, asyncio.Lock] = {}
+    results: Dict[Hashable, FanOutResult] = {}
+
+    async def run(key: Hashable, bucket: Hashable, factory):
+        lock = bucket_locks.setdefault(bucket, asyncio.Lock())
+        async with lock, limiter:
+            started = time.monotonic()
+            try:
+                await factory()
+                results[key] = FanOutResult(key, True, time.monotonic() - started)
+            except Exception as e:
+                results[key] = FanOutResult(key, False, time.monotonic() - started, str(e))
+
+    tasks = {asyncio.create_task(run(key, bucket, factory)): key for key, bucket, factory in jobs}
+    if not tasks:
+        return []
+
+    done, pending = await asyncio.wait(tasks, timeout=timeout)
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+        for task in pending:
+            key = tasks[task]
+            results.setdefault(key, FanOutResult(key, False, timeout or 0.0, "timed out"))
+
+    return [results[key] for key in tasks.values() if key in results]
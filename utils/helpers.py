@@ -1,39 +1,22 @@
 import discord
-import json
 import logging
 from typing import Optional, List
+from utils.config_store import config_store
+from utils.permissions import permission_resolver
 
 logger = logging.getLogger(__name__)
 
 def load_config() -> dict:
-    """Load configuration from config.json"""
-    try:
-        with open('config.json', 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        logger.error("config.json not found")
-        return {}
-    except json.JSONDecodeError:
-        logger.error("Invalid JSON in config.json")
-        return {}
+    """Return the shared in-memory configuration (see utils.config_store)"""
+    return config_store.data
 
-def save_config(config: dict) -> bool:
-    """Save configuration to config.json"""
-    try:
-        with open('config.json', 'w') as f:
-            json.dump(config, f, indent=2)
-        return True
-    except Exception as e:
-        logger.error(f"Error saving config: {e}")
-        return False
+def save_config(config: Optional[dict] = None) -> bool:
+    """Persist the shared configuration to config.json"""
+    return config_store.save()
 
-def has_staff_role(user: discord.Member, config: dict) -> bool:
-    """Check if user has any staff role"""
-    staff_role_ids = config.get('staff_role_ids', [])
-    for role in user.roles:
-        if role.id in staff_role_ids:
-            return True
-    return False
+def has_staff_role(user: discord.Member, config: Optional[dict] = None) -> bool:
+    """Check if user has any staff role (config is unused, roles come from the shared store)"""
+    return permission_resolver.is_staff(user)
 
 def can_manage_tickets(user: discord.Member, channel: discord.TextChannel, config: dict) -> bool:
     """Check if user can manage tickets (close, etc.)"""
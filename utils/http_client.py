@@ -0,0 +1,25 @@
+import aiohttp
+
+# Connection pool shared by every cog that calls external HTTP APIs
+POOL_LIMIT = 50
+POOL_LIMIT_PER_HOST = 8
+DNS_CACHE_TTL = 300  # seconds
+KEEPALIVE_TIMEOUT = 60  # seconds an idle connection is kept open
+
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=20, connect=5, sock_read=15)
+
+USER_AGENT = "NeonViceBot/1.0 (+https://discord.com)"
+
+def create_http_session() -> aiohttp.ClientSession:
+    """Create the bot-wide aiohttp session (must be called inside the event loop)"""
+    connector = aiohttp.TCPConnector(
+        limit=POOL_LIMIT,
+        limit_per_host=POOL_LIMIT_PER_HOST,
+        ttl_dns_cache=DNS_CACHE_TTL,
+        keepalive_timeout=KEEPALIVE_TIMEOUT
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=REQUEST_TIMEOUT,
+        headers={'User-Agent': USER_AGENT}
+    )
@@ -0,0 +1,136 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from utils.config_store import WriteBehind
+
+logger = logging.getLogger(__name__)
+
+Job = Dict[str, Any]
+
+class JobQueue:
+    """Durable queue of background jobs processed by a bounded worker pool.
+
+    Jobs are persisted to a JSON file until they finish, so pending work
+    survives a restart. A failed job is retried with exponential backoff up
+    to max_attempts times, after which on_give_up (if any) is called.
+    Handlers may update the job's "state" dict and call save() to record
+    progress, so a retry can skip the steps that already succeeded. Jobs
+    enqueued before start() wait until it is called.
+    """
+
+    def __init__(self, path: str, handler: Callable[[Job], Awaitable[None]], workers: int = 3,
+                 max_attempts: int = 5, retry_delay: float = 10,
+                 on_give_up: Optional[Callable[[Job], Awaitable[None]]] = None):
+        self.path = path
+        self.handler = handler
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.on_give_up = on_give_up
+        self.jobs: Dict[str, Job] = {}
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._writer = WriteBehind.to_file(path, lambda: json.dumps(self.jobs), 'job queue')
+        self.started = False
+
+    def load(self):
+        """Read the jobs left pending by the previous run"""
+        try:
+            with open(self.path, 'r') as f:
+                self.jobs = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.error(f"Error loading job queue from {self.path}: {e}")
+            return
+        logger.info(f"Loaded {len(self.jobs)} pending job(s) from {self.path}")
+
+    def start(self):
+        """Start the workers and schedule the pending jobs"""
+        if self.started:
+            return
+        self.started = True
+        for job in self.jobs.values():
+            self._schedule(job)
+        for _ in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    async def stop(self):
+        """Stop the workers; unfinished jobs stay persisted for the next start"""
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._queue = asyncio.Queue()
+        self.started = False
+        await self._writer.close()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.jobs
+
+    def enqueue(self, key: str, payload: Dict[str, Any]) -> bool:
+        """Add a job. Returns False if a job with the same key is already pending"""
+        if key in self.jobs:
+            return False
+        job = {'key': key, 'payload': payload, 'state': {}, 'attempts': 0, 'not_before': 0}
+        self.jobs[key] = job
+        self.save()
+        if self.started:
+            self._schedule(job)
+        return True
+
+    def _schedule(self, job: Job):
+        delay = job['not_before'] - time.time()
+        if delay <= 0:
+            self._queue.put_nowait(job['key'])
+        else:
+            loop = asyncio.get_running_loop()
+            self._timers[job['key']] = loop.call_later(delay, self._release, job['key'])
+
+    def _release(self, key: str):
+        self._timers.pop(key, None)
+        self._queue.put_nowait(key)
+
+    async def _worker(self):
+        while True:
+            key = await self._queue.get()
+            job = self.jobs.get(key)
+            if job is None:
+                continue
+            job['attempts'] += 1
+            try:
+                await self.handler(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if job['attempts'] >= self.max_attempts:
+                    logger.error(f"Job {key} failed after {job['attempts']} attempt(s), giving up: {e}")
+                    await self._give_up(job)
+                else:
+                    delay = self.retry_delay * 2 ** (job['attempts'] - 1)
+                    logger.warning(f"Job {key} failed (attempt {job['attempts']}), retrying in {delay:.0f}s: {e}")
+                    job['not_before'] = time.time() + delay
+                    self.save()
+                    self._schedule(job)
+                continue
+            self.jobs.pop(key, None)
+            self.save()
+
+    async def _give_up(self, job: Job):
+        self.jobs.pop(job['key'], None)
+        self.save()
+        if self.on_give_up:
+            try:
+                await self.on_give_up(job)
+            except Exception as e:
+                logger.error(f"Error handling abandoned job {job['key']}: {e}")
+
+    def save(self):
+        """Schedule a write of the pending jobs"""
+        self._writer.schedule()
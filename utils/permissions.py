@@ -0,0 +1,76 @@
+import logging
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+import discord
+from utils.config_store import ConfigStore, config_store
+
+logger = logging.getLogger(__name__)
+
+# Member role sets cached at most; the cache is simply cleared when full
+MEMBER_CACHE_SIZE = 10000
+
+class PermissionResolver:
+    """Answers staff/moderator checks with set intersections.
+
+    The configured role IDs of each guild are kept as frozensets and each
+    member's role IDs as a set, so a check costs O(min(roles, configured
+    roles)) instead of a lookup per configured role. Role sets are dropped
+    when the config changes and member sets on on_member_update.
+    """
+
+    def __init__(self, store: ConfigStore):
+        self.store = store
+        self._guild_roles: Dict[Tuple[int, str], FrozenSet[int]] = {}
+        self._member_roles: Dict[Tuple[int, int], FrozenSet[int]] = {}
+        store.add_listener(self.on_config_change)
+
+    def role_ids(self, guild_id: int, key: str) -> FrozenSet[int]:
+        """Role IDs configured under a setting key (e.g. staff_role_ids)"""
+        roles = self._guild_roles.get((guild_id, key))
+        if roles is None:
+            roles = self._guild_roles[(guild_id, key)] = frozenset(self.store.get(guild_id, key, []))
+        return roles
+
+    def member_role_ids(self, member: discord.Member) -> FrozenSet[int]:
+        key = (member.guild.id, member.id)
+        roles = self._member_roles.get(key)
+        if roles is None:
+            if len(self._member_roles) >= MEMBER_CACHE_SIZE:
+                self._member_roles.clear()
+            roles = self._member_roles[key] = frozenset(role.id for role in member.roles)
+        return roles
+
+    def has_configured_role(self, member: discord.Member, key: str) -> bool:
+        configured = self.role_ids(member.guild.id, key)
+        return bool(configured) and not configured.isdisjoint(self.member_role_ids(member))
+
+    def is_staff(self, member: discord.Member) -> bool:
+        """Member has one of the guild's ticket staff roles"""
+        return self.has_configured_role(member, 'staff_role_ids')
+
+    def is_moderator(self, member: discord.Member) -> bool:
+        """Member is an administrator, has a moderation permission or a moderation role"""
+        permissions = member.guild_permissions
+        if (permissions.administrator or permissions.ban_members or
+                permissions.manage_messages or permissions.moderate_members):
+            return True
+        return self.has_configured_role(member, 'moderation_role_ids')
+
+    def on_config_change(self, guild_id: Optional[int], keys: Iterable[str]):
+        if guild_id is None:
+            self._guild_roles.clear()
+            return
+        for key in keys:
+            self._guild_roles.pop((guild_id, key), None)
+
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        self._member_roles.pop((after.guild.id, after.id), None)
+
+    async def on_member_remove(self, member: discord.Member):
+        self._member_roles.pop((member.guild.id, member.id), None)
+
+    async def on_guild_role_delete(self, role: discord.Role):
+        # Members lose the role without a member update
+        self._member_roles.clear()
+
+# Shared instance used by the cogs and helpers
+permission_resolver = PermissionResolver(config_store)
@@ -0,0 +1,28 @@
+import time
+
+class TokenBucket:
+    """Token bucket allowing bursts of `capacity` and `rate` actions per second on average"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def consume(self, tokens: float = 1) -> bool:
+        """Take tokens if available. Returns False if the action must be refused"""
+        self._refill()
+        if self.tokens < tokens:
+            return False
+        self.tokens -= tokens
+        return True
+
+    def retry_after(self, tokens: float = 1) -> float:
+        """Seconds until `tokens` tokens are available"""
+        self._refill()
+        return max(0.0, (tokens - self.tokens) / self.rate)
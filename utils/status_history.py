@@ -0,0 +1,199 @@
+import asyncio
+import json
+import logging
+import time
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from utils.config_store import atomic_write
+
+logger = logging.getLogger(__name__)
+
+# A status change: (timestamp, service, previous status, new status)
+Transition = Tuple[float, str, Optional[str], str]
+
+def is_operational(status: str) -> bool:
+    return status.startswith("🟢")
+
+def is_unknown(status: str) -> bool:
+    """Status that could not be read (component not found or not parsed)"""
+    return status.startswith("❓")
+
+class StatusHistory:
+    """Bounded history of per-service status transitions.
+
+    Transitions are kept in fixed-size arrays used as a ring buffer, so memory
+    stays constant however long the bot runs: only the newest `capacity`
+    changes are remembered. Services and status texts are stored as small
+    integer codes.
+    """
+
+    def __init__(self, services: Sequence[str], capacity: int = 4096, path: Optional[str] = None):
+        self.capacity = capacity
+        self.path = path
+        self.services: List[str] = list(services)
+        self.statuses: List[str] = []
+        self._service_codes = {name: code for code, name in enumerate(self.services)}
+        self._status_codes: Dict[str, int] = {}
+        self.times = array('d', [0.0]) * capacity
+        self.service_ids = array('H', [0]) * capacity
+        self.status_ids = array('H', [0]) * capacity
+        self.start = 0
+        self.size = 0
+        self.current: Dict[str, str] = {}
+        self.extra: Dict[str, Any] = {}  # caller state saved along with the history (set dirty after changing it)
+        self.dirty = False
+        self.last_flush = time.monotonic()
+
+    def _service_code(self, service: str) -> int:
+        code = self._service_codes.get(service)
+        if code is None:
+            code = self._service_codes[service] = len(self.services)
+            self.services.append(service)
+        return code
+
+    def _status_code(self, status: str) -> int:
+        code = self._status_codes.get(status)
+        if code is None:
+            code = self._status_codes[status] = len(self.statuses)
+            self.statuses.append(status)
+        return code
+
+    def _append(self, timestamp: float, service: str, status: str):
+        index = (self.start + self.size) % self.capacity
+        if self.size == self.capacity:
+            self.start = (self.start + 1) % self.capacity
+        else:
+            self.size += 1
+        self.times[index] = timestamp
+        self.service_ids[index] = self._service_code(service)
+        self.status_ids[index] = self._status_code(status)
+
+    def record(self, status_data: Dict[str, str], timestamp: Optional[float] = None) -> List[Transition]:
+        """Record a status sample and return the transitions it caused"""
+        timestamp = time.time() if timestamp is None else timestamp
+        transitions = []
+        for service, status in status_data.items():
+            if service == 'overall':
+                continue
+            previous = self.current.get(service)
+            if previous == status:
+                continue
+            self.current[service] = status
+            self._append(timestamp, service, status)
+            transitions.append((timestamp, service, previous, status))
+        if transitions:
+            self.dirty = True
+        return transitions
+
+    def __iter__(self) -> Iterator[Tuple[float, str, str]]:
+        """Iterate over (timestamp, service, status) from oldest to newest"""
+        for offset in range(self.size):
+            index = (self.start + offset) % self.capacity
+            yield (
+                self.times[index],
+                self.services[self.service_ids[index]],
+                self.statuses[self.status_ids[index]]
+            )
+
+    def oldest(self) -> Optional[float]:
+        return self.times[self.start] if self.size else None
+
+    def latest(self) -> Optional[float]:
+        return self.times[(self.start + self.size - 1) % self.capacity] if self.size else None
+
+    def periods(self, since: float, until: Optional[float] = None) -> Dict[str, List[Tuple[float, float, str]]]:
+        """Split [since, until] into (start, end, status) periods per service"""
+        until = time.time() if until is None else until
+        state: Dict[str, Tuple[float, str]] = {}
+        periods: Dict[str, List[Tuple[float, float, str]]] = {}
+        for timestamp, service, status in self:
+            if timestamp > until:
+                break
+            if service in state:
+                started, previous = state[service]
+                if timestamp > since:
+                    periods.setdefault(service, []).append((max(started, since), timestamp, previous))
+            state[service] = (timestamp, status)
+        for service, (started, status) in state.items():
+            periods.setdefault(service, []).append((max(started, since), until, status))
+        return periods
+
+    def uptime(self, since: float, until: Optional[float] = None,
+               is_operational=is_operational, is_unknown=is_unknown) -> Dict[str, float]:
+        """Fraction of known time each service was operational in the window.
+
+        Time spent in an unknown status counts neither as up nor as down.
+        """
+        result = {}
+        for service, service_periods in self.periods(since, until).items():
+            total = sum(end - start for start, end, status in service_periods if not is_unknown(status))
+            if total <= 0:
+                continue
+            up = sum(end - start for start, end, status in service_periods if is_operational(status))
+            result[service] = up / total
+        return result
+
+    def incidents(self, since: float, until: Optional[float] = None,
+                  is_operational=is_operational, is_unknown=is_unknown) -> List[Tuple[str, str, float, float, bool]]:
+        """Known non-operational windows as (service, status, start, end, ongoing), newest first"""
+        until = time.time() if until is None else until
+        incidents = []
+        for service, service_periods in self.periods(since, until).items():
+            for start, end, status in service_periods:
+                if not is_operational(status) and not is_unknown(status) and end > start:
+                    ongoing = end >= until and self.current.get(service) == status
+                    incidents.append((service, status, start, end, ongoing))
+        incidents.sort(key=lambda incident: incident[2], reverse=True)
+        return incidents
+
+    def to_dict(self) -> dict:
+        return {
+            'services': self.services,
+            'statuses': self.statuses,
+            'events': [
+                [self.times[i], self.service_ids[i], self.status_ids[i]]
+                for i in ((self.start + offset) % self.capacity for offset in range(self.size))
+            ],
+            'current': self.current,
+            'extra': self.extra
+        }
+
+    def load(self):
+        """Restore the history saved by flush(), if any"""
+        if not self.path:
+            return
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.error(f"Error loading status history from {self.path}: {e}")
+            return
+
+        services = data.get('services', [])
+        statuses = data.get('statuses', [])
+        for timestamp, service_id, status_id in data.get('events', [])[-self.capacity:]:
+            self._append(timestamp, services[service_id], statuses[status_id])
+        self.current = data.get('current', {})
+        self.extra = data.get('extra', {})
+        logger.info(f"Loaded {self.size} status transition(s) from {self.path}")
+
+    def flush_due(self, interval: float) -> bool:
+        return self.dirty and time.monotonic() - self.last_flush >= interval
+
+    async def flush(self) -> bool:
+        """Write the history to disk off the event loop"""
+        if not self.path or not self.dirty:
+            return True
+        # Serialize on the loop so the payload is consistent
+        payload = json.dumps(self.to_dict())
+        self.dirty = False
+        self.last_flush = time.monotonic()
+        try:
+            await asyncio.to_thread(atomic_write, self.path, payload)
+            return True
+        except Exception as e:
+            self.dirty = True
+            logger.error(f"Error saving status history to {self.path}: {e}")
+            return False
@@ -0,0 +1,203 @@
+import bisect
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+from utils.config_store import WriteBehind
+
+logger = logging.getLogger(__name__)
+
+TICKET_METRICS_PATH = os.getenv('TICKET_METRICS_PATH', 'ticket_metrics.json')
+
+# Upper bounds (seconds) of the duration histogram buckets; the last bucket is unbounded
+DURATION_BUCKETS = (
+    60, 5 * 60, 15 * 60, 30 * 60, 60 * 60, 2 * 3600, 4 * 3600, 8 * 3600,
+    24 * 3600, 2 * 86400, 7 * 86400
+)
+
+# Days of per-day ticket counts kept
+DAILY_HISTORY_DAYS = 30
+
+def _empty_guild() -> Dict[str, Any]:
+    return {
+        'created': 0,
+        'closed': 0,
+        'first_response': [0] * (len(DURATION_BUCKETS) + 1),
+        'resolution': [0] * (len(DURATION_BUCKETS) + 1),
+        'first_response_sum': 0.0,
+        'resolution_sum': 0.0,
+        'daily': {},
+    }
+
+def histogram_percentile(counts: List[int], q: float) -> Optional[float]:
+    """Upper bound of the bucket holding the q-quantile (inf for the last bucket)"""
+    total = sum(counts)
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for index, count in enumerate(counts):
+        seen += count
+        if seen >= rank:
+            return DURATION_BUCKETS[index] if index < len(DURATION_BUCKETS) else float('inf')
+    return float('inf')
+
+class TicketMetrics:
+    """Ticket lifecycle events folded into per-guild aggregates as they happen.
+
+    Only the open tickets and fixed-size aggregates (counters, duration
+    histograms, a short per-day series) are stored, so reading the stats
+    never scans ticket history.
+    """
+
+    def __init__(self, path: str = TICKET_METRICS_PATH):
+        self.path = path
+        self.open: Dict[str, Dict[str, Any]] = {}  # channel_id -> {guild_id, user_id, created_at, first_response_at}
+        self.guilds: Dict[str, Dict[str, Any]] = {}
+        self._writer = WriteBehind.to_file(
+            path, lambda: json.dumps({'open': self.open, 'guilds': self.guilds}), 'ticket metrics'
+        )
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.error(f"Error loading ticket metrics from {self.path}: {e}")
+            return
+        self.open = data.get('open', {})
+        self.guilds = data.get('guilds', {})
+
+    def _guild(self, guild_id: int) -> Dict[str, Any]:
+        stats = self.guilds.get(str(guild_id))
+        if stats is None:
+            stats = self.guilds[str(guild_id)] = _empty_guild()
+        return stats
+
+    @staticmethod
+    def _observe(stats: Dict[str, Any], name: str, seconds: float):
+        stats[name][bisect.bisect_left(DURATION_BUCKETS, seconds)] += 1
+        stats[f'{name}_sum'] += seconds
+
+    def created(self, guild_id: int, channel_id: int, user_id: int, timestamp: Optional[float] = None):
+        timestamp = time.time() if timestamp is None else timestamp
+        if str(channel_id) in self.open:
+            return
+        self.open[str(channel_id)] = {
+            'guild_id': guild_id,
+            'user_id': user_id,
+            'created_at': timestamp,
+            'first_response_at': None,
+        }
+        stats = self._guild(guild_id)
+        stats['created'] += 1
+        day = datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%d')
+        daily = stats['daily']
+        daily[day] = daily.get(day, 0) + 1
+        for old_day in sorted(daily)[:-DAILY_HISTORY_DAYS]:
+            del daily[old_day]
+        self.save()
+
+    def needs_first_response(self, channel_id: int) -> Optional[Dict[str, Any]]:
+        """Return the open ticket if it has not been answered by staff yet"""
+        ticket = self.open.get(str(channel_id))
+        if ticket and ticket['first_response_at'] is None:
+            return ticket
+        return None
+
+    def first_response(self, channel_id: int, timestamp: Optional[float] = None):
+        ticket = self.needs_first_response(channel_id)
+        if ticket is None:
+            return
+        timestamp = time.time() if timestamp is None else timestamp
+        ticket['first_response_at'] = timestamp
+        self._observe(self._guild(ticket['guild_id']), 'first_response', timestamp - ticket['created_at'])
+        self.save()
+
+    def closed(self, channel_id: int, timestamp: Optional[float] = None):
+        ticket = self.open.pop(str(channel_id), None)
+        if ticket is None:
+            return
+        timestamp = time.time() if timestamp is None else timestamp
+        stats = self._guild(ticket['guild_id'])
+        stats['closed'] += 1
+        self._observe(stats, 'resolution', timestamp - ticket['created_at'])
+        self.save()
+
+    def reconcile(self, is_open: Callable[[int], bool]) -> int:
+        """Count as closed the open tickets whose channel is gone (deleted while offline).
+
+        Their close time is unknown, so they are left out of the resolution
+        histogram. Returns how many were closed.
+        """
+        gone = [channel_id for channel_id in self.open if not is_open(int(channel_id))]
+        for channel_id in gone:
+            ticket = self.open.pop(channel_id)
+            self._guild(ticket['guild_id'])['closed'] += 1
+        if gone:
+            self.save()
+        return len(gone)
+
+    def open_count(self, guild_id: int) -> int:
+        stats = self.guilds.get(str(guild_id))
+        return stats['created'] - stats['closed'] if stats else 0
+
+    def summary(self, guild_id: int, days: int = 7) -> Dict[str, Any]:
+        """Aggregates for /ticket-stats"""
+        stats = self.guilds.get(str(guild_id)) or _empty_guild()
+        today = datetime.now(timezone.utc).strftime('%Y-%m-%d')
+        recent = sorted(stats['daily'].items())[-days:]
+        return {
+            'open': self.open_count(guild_id),
+            'created': stats['created'],
+            'closed': stats['closed'],
+            'today': stats['daily'].get(today, 0),
+            'per_day': sum(count for _, count in recent) / days,
+            'first_response_p50': histogram_percentile(stats['first_response'], 0.5),
+            'first_response_p95': histogram_percentile(stats['first_response'], 0.95),
+            'first_response_count': sum(stats['first_response']),
+            'resolution_p50': histogram_percentile(stats['resolution'], 0.5),
+            'resolution_p95': histogram_percentile(stats['resolution'], 0.95),
+        }
+
+    def prometheus(self) -> str:
+        """Render all guilds' aggregates in the Prometheus text exposition format.
+
+        Each metric family is written as one block (TYPE line, then all its samples).
+        """
+        lines = []
+        families = (
+            ('tickets_open', 'gauge', lambda stats: stats['created'] - stats['closed']),
+            ('tickets_created_total', 'counter', lambda stats: stats['created']),
+            ('tickets_closed_total', 'counter', lambda stats: stats['closed']),
+        )
+        for metric, metric_type, value in families:
+            lines.append(f"# TYPE {metric} {metric_type}")
+            for guild_id, stats in self.guilds.items():
+                lines.append(f'{metric}{{guild="{guild_id}"}} {value(stats)}')
+        for name in ('first_response', 'resolution'):
+            metric = f"ticket_{name}_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            for guild_id, stats in self.guilds.items():
+                cumulative = 0
+                for bound, count in zip(DURATION_BUCKETS + ('+Inf',), stats[name]):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{guild="{guild_id}",le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_sum{{guild="{guild_id}"}} {stats[f"{name}_sum"]}')
+                lines.append(f'{metric}_count{{guild="{guild_id}"}} {cumulative}')
+        return "\n".join(lines) + "\n"
+
+    def save(self):
+        """Schedule a write of the metrics"""
+        self._writer.schedule()
+
+    async def close(self):
+        """Write pending changes before shutdown"""
+        await self._writer.close()
+
+# Shared instance used by the ticket views and cog
+ticket_metrics = TicketMetrics()
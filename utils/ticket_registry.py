@@ -0,0 +1,127 @@
+import json
+import logging
+import os
+import re
+from collections import Counter
+from typing import Any, Dict, Optional
+import discord
+from utils.config_store import WriteBehind
+
+logger = logging.getLogger(__name__)
+
+TICKETS_PATH = os.getenv('TICKETS_PATH', 'tickets.json')
+
+# Ticket channel topics end with "(<creator user id>)"
+TOPIC_USER_ID = re.compile(r'\((\d{15,25})\)\s*$')
+
+def ticket_owner_from_topic(topic: Optional[str]) -> Optional[int]:
+    """Extract the creator's user ID from a ticket channel topic"""
+    if not topic:
+        return None
+    match = TOPIC_USER_ID.search(topic)
+    return int(match.group(1)) if match else None
+
+class TicketRegistry:
+    """Index of open tickets: (guild, user) -> channel and channel -> metadata.
+
+    Kept in memory for O(1) duplicate and ownership checks, persisted to
+    TICKETS_PATH, and rebuilt from the guild channels at startup.
+    """
+
+    def __init__(self, path: str = TICKETS_PATH):
+        self.path = path
+        self.tickets: Dict[int, Dict[str, Any]] = {}  # channel_id -> {guild_id, user_id, created_at}
+        self.by_user: Dict[tuple, int] = {}  # (guild_id, user_id) -> channel_id
+        self.open_counts: Counter = Counter()  # guild_id -> open tickets
+        self._writer = WriteBehind.to_file(path, self._payload, 'ticket registry')
+
+    def load(self):
+        """Read the persisted registry (used until the guilds are rebuilt)"""
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.error(f"Error loading ticket registry from {self.path}: {e}")
+            return
+        for channel_id, ticket in data.items():
+            self._index(int(channel_id), ticket)
+        logger.info(f"Loaded {len(self.tickets)} open ticket(s) from {self.path}")
+
+    def _index(self, channel_id: int, ticket: Dict[str, Any]):
+        if channel_id not in self.tickets:
+            self.open_counts[ticket['guild_id']] += 1
+        self.tickets[channel_id] = ticket
+        self.by_user[(ticket['guild_id'], ticket['user_id'])] = channel_id
+
+    def get(self, channel_id: int) -> Optional[Dict[str, Any]]:
+        return self.tickets.get(channel_id)
+
+    def get_by_user(self, guild_id: int, user_id: int) -> Optional[int]:
+        """Return the channel ID of the user's open ticket, if any"""
+        return self.by_user.get((guild_id, user_id))
+
+    def open_count(self, guild_id: int) -> int:
+        return self.open_counts[guild_id]
+
+    def add(self, guild_id: int, user_id: int, channel_id: int, created_at: float, **extra: Any):
+        """Register a newly opened ticket"""
+        self._index(channel_id, {'guild_id': guild_id, 'user_id': user_id, 'created_at': created_at, **extra})
+        self.save()
+
+    def remove(self, channel_id: int) -> Optional[Dict[str, Any]]:
+        """Forget a ticket, returning its metadata"""
+        ticket = self.tickets.pop(channel_id, None)
+        if ticket is None:
+            return None
+        self.open_counts[ticket['guild_id']] -= 1
+        key = (ticket['guild_id'], ticket['user_id'])
+        if self.by_user.get(key) == channel_id:
+            del self.by_user[key]
+        self.save()
+        return ticket
+
+    def rebuild(self, guild: discord.Guild, category_id: Optional[int] = None) -> int:
+        """Re-index a guild's open tickets from its channels.
+
+        Ticket channels are looked up in the ticket category when one is
+        configured, otherwise among all channels named ticket-*.
+        """
+        for channel_id, ticket in list(self.tickets.items()):
+            if ticket['guild_id'] == guild.id:
+                self.tickets.pop(channel_id)
+                self.by_user.pop((guild.id, ticket['user_id']), None)
+        self.open_counts.pop(guild.id, None)
+
+        category = guild.get_channel(category_id) if category_id else None
+        channels = category.text_channels if isinstance(category, discord.CategoryChannel) else guild.text_channels
+        count = 0
+        for channel in channels:
+            if not channel.name.startswith('ticket-'):
+                continue
+            user_id = ticket_owner_from_topic(channel.topic)
+            if user_id is None:
+                continue
+            self._index(channel.id, {
+                'guild_id': guild.id,
+                'user_id': user_id,
+                'created_at': channel.created_at.timestamp()
+            })
+            count += 1
+        self.save()
+        return count
+
+    def save(self):
+        """Schedule a write of the registry (written immediately outside the event loop)"""
+        self._writer.schedule()
+
+    async def close(self):
+        """Write pending changes before shutdown"""
+        await self._writer.close()
+
+    def _payload(self) -> str:
+        return json.dumps({str(channel_id): ticket for channel_id, ticket in self.tickets.items()})
+
+# Shared instance used by the ticket views and cog
+ticket_registry = TicketRegistry()
@@ -0,0 +1,140 @@
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+TRANSCRIPT_ARCHIVE_PATH = os.getenv('TRANSCRIPT_ARCHIVE_PATH', 'transcripts.db')
+
+def entry_text(entry: Dict[str, Any]) -> str:
+    """Searchable text of a transcript entry: content, embeds and attachment names"""
+    parts = [entry['content']] if entry['content'] else []
+    for embed in entry['embeds']:
+        parts.extend(text for text in (embed['title'], embed['description']) if text)
+        parts.extend(f"{name} {value}" for name, value in embed['fields'])
+    parts.extend(attachment['filename'] for attachment in entry['attachments'])
+    return "\n".join(parts)
+
+class TranscriptArchive:
+    """SQLite archive of closed ticket transcripts with a full-text index.
+
+    One FTS5 row is stored per message (content and author) plus one per
+    ticket holding its metadata (channel, creator, closer), so a single
+    MATCH finds tickets by either. Falls back to LIKE queries on a plain
+    table when SQLite was built without FTS5. Blocking; call from a worker
+    thread.
+    """
+
+    def __init__(self, path: str = TRANSCRIPT_ARCHIVE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS tickets ('
+            ' channel_id INTEGER PRIMARY KEY,'
+            ' guild_id INTEGER NOT NULL,'
+            ' channel_name TEXT NOT NULL,'
+            ' creator_id INTEGER,'
+            ' creator_name TEXT,'
+            ' closed_by TEXT,'
+            ' closed_at REAL NOT NULL,'
+            ' message_count INTEGER NOT NULL)'
+        )
+        try:
+            self.conn.execute(
+                'CREATE VIRTUAL TABLE IF NOT EXISTS transcript_search USING fts5('
+                ' content, author, channel_id UNINDEXED, guild_id UNINDEXED)'
+            )
+            self.fts = True
+        except sqlite3.OperationalError:
+            logger.warning("SQLite FTS5 not available, transcript search will use LIKE")
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS transcript_search ('
+                ' content TEXT, author TEXT, channel_id INTEGER, guild_id INTEGER)'
+            )
+            self.fts = False
+        self.conn.commit()
+
+    def store(self, ticket: Dict[str, Any], entries: Iterable[Dict[str, Any]]) -> int:
+        """Archive a ticket's transcript, replacing any previous copy. Returns the message count"""
+        channel_id, guild_id = ticket['channel_id'], ticket['guild_id']
+        with self._lock, self.conn:
+            if self.conn.execute('SELECT 1 FROM tickets WHERE channel_id = ?', (channel_id,)).fetchone():
+                # Retried archival: drop the previous copy (full scan, but only on retries)
+                self.conn.execute('DELETE FROM transcript_search WHERE channel_id = ?', (channel_id,))
+            count = 0
+            rows = []
+            for entry in entries:
+                text = entry_text(entry)
+                if text:
+                    rows.append((text, entry['author'], channel_id, guild_id))
+                count += 1
+                if len(rows) >= 500:
+                    self.conn.executemany('INSERT INTO transcript_search VALUES (?, ?, ?, ?)', rows)
+                    rows.clear()
+            metadata = " ".join(str(ticket.get(key) or '') for key in ('channel_name', 'creator_name', 'closed_by'))
+            rows.append((metadata, '', channel_id, guild_id))
+            self.conn.executemany('INSERT INTO transcript_search VALUES (?, ?, ?, ?)', rows)
+            self.conn.execute(
+                'INSERT OR REPLACE INTO tickets VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (channel_id, guild_id, ticket['channel_name'], ticket.get('creator_id'),
+                 ticket.get('creator_name'), ticket.get('closed_by'), ticket['closed_at'], count)
+            )
+        return count
+
+    def search(self, guild_id: int, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Return the best matching tickets of a guild with a snippet of the match"""
+        with self._lock:
+            if self.fts:
+                # Quote every term so user input can't break the FTS query syntax
+                match = " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+                if not match:
+                    return []
+                rows = self.conn.execute(
+                    'SELECT channel_id, snippet(transcript_search, 0, \'**\', \'**\', \'…\', 16) '
+                    'FROM transcript_search WHERE transcript_search MATCH ? AND guild_id = ? '
+                    'ORDER BY rank LIMIT 200',
+                    (match, guild_id)
+                ).fetchall()
+            else:
+                pattern = f"%{query}%"
+                rows = self.conn.execute(
+                    'SELECT channel_id, substr(content, 1, 120) FROM transcript_search '
+                    'WHERE guild_id = ? AND (content LIKE ? OR author LIKE ?) LIMIT 200',
+                    (guild_id, pattern, pattern)
+                ).fetchall()
+
+            # Keep the best match of each ticket
+            best: Dict[int, str] = {}
+            for channel_id, snippet in rows:
+                best.setdefault(channel_id, snippet)
+                if len(best) >= limit:
+                    break
+
+            results = []
+            for channel_id, snippet in best.items():
+                ticket = self.conn.execute(
+                    'SELECT channel_name, creator_id, creator_name, closed_by, closed_at, message_count '
+                    'FROM tickets WHERE channel_id = ?',
+                    (channel_id,)
+                ).fetchone()
+                if ticket is None:
+                    continue
+                channel_name, creator_id, creator_name, closed_by, closed_at, message_count = ticket
+                results.append({
+                    'channel_id': channel_id,
+                    'channel_name': channel_name,
+                    'creator_id': creator_id,
+                    'creator_name': creator_name,
+                    'closed_by': closed_by,
+                    'closed_at': closed_at,
+                    'message_count': message_count,
+                    'snippet': snippet,
+                })
+            return results
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,169 @@
+import asyncio
+import json
+import logging
+import os
+from typing import Any, Dict, Iterator, List, Optional, Set
+from utils.config_store import WriteBehind
+
+logger = logging.getLogger(__name__)
+
+TRANSCRIPT_LOG_DIR = os.getenv('TICKET_LOG_DIR', 'ticket_logs')
+
+class TranscriptLog:
+    """Append-only JSONL log of each open ticket's messages.
+
+    Records are {"op": "create" | "edit", "id", "entry"} or {"op": "delete", "id"},
+    where entry is the dict built by utils.transcripts.message_to_entry.
+    Capturing a message only queues its record in memory; queued records are
+    appended to the logs in a worker thread, coalesced like the other
+    write-behind state. Only tickets whose log was started when they were
+    opened are captured, so a log is never missing the beginning of a
+    conversation.
+    """
+
+    def __init__(self, directory: str = TRANSCRIPT_LOG_DIR):
+        self.directory = directory
+        self.last_ids: Dict[int, int] = {}  # channel_id -> newest captured message ID
+        self.active: Set[int] = set()  # channels with a log
+        self._pending: Dict[int, List[str]] = {}  # channel_id -> records not yet on disk
+        self._writer = WriteBehind(
+            self._take_pending, self._write_pending, 'transcript logs', on_error=self._restore_pending
+        )
+
+    def load(self):
+        """Find the logs of tickets that were open when the bot stopped.
+
+        Blocking (reads every log once to find its newest message); call from
+        a worker thread.
+        """
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return
+        self.active = {int(name[:-6]) for name in names if name.endswith('.jsonl') and name[:-6].isdigit()}
+        for channel_id in self.active:
+            newest = 0
+            for record in self._records(channel_id):
+                if record.get('op') == 'create':
+                    newest = max(newest, record['id'])
+            self.last_ids[channel_id] = newest
+        logger.info(f"Found {len(self.active)} ticket transcript log(s) in {self.directory}")
+
+    def path(self, channel_id: int) -> str:
+        return os.path.join(self.directory, f"{channel_id}.jsonl")
+
+    def exists(self, channel_id: int) -> bool:
+        return channel_id in self.active
+
+    def start(self, channel_id: int):
+        """Begin capturing a newly opened ticket (the file is created by the first write)"""
+        self.active.add(channel_id)
+        self.last_ids[channel_id] = 0
+
+    def _append(self, channel_id: int, record: dict):
+        if channel_id not in self.active:
+            return
+        self._pending.setdefault(channel_id, []).append(json.dumps(record, ensure_ascii=False) + "\n")
+        self._writer.schedule()
+
+    def _take_pending(self) -> Dict[int, List[str]]:
+        pending, self._pending = self._pending, {}
+        return pending
+
+    def _restore_pending(self, pending: Dict[int, List[str]]):
+        for channel_id, lines in pending.items():
+            if channel_id in self.active:
+                self._pending[channel_id] = lines + self._pending.get(channel_id, [])
+
+    def _write_pending(self, pending: Dict[int, List[str]]):
+        os.makedirs(self.directory, exist_ok=True)
+        for channel_id, lines in pending.items():
+            if channel_id not in self.active:
+                continue
+            with open(self.path(channel_id), 'a', encoding='utf-8') as f:
+                f.writelines(lines)
+
+    async def flush(self) -> bool:
+        """Write the queued records now, off the event loop"""
+        return await self._writer.flush()
+
+    async def close(self):
+        await self._writer.close()
+
+    def add(self, channel_id: int, message_id: int, entry: Dict[str, Any]):
+        if channel_id not in self.active:
+            return
+        self._append(channel_id, {'op': 'create', 'id': message_id, 'entry': entry})
+        if message_id > self.last_ids.get(channel_id, 0):
+            self.last_ids[channel_id] = message_id
+
+    def edit(self, channel_id: int, message_id: int, entry: Dict[str, Any]):
+        self._append(channel_id, {'op': 'edit', 'id': message_id, 'entry': entry})
+
+    def delete(self, channel_id: int, message_id: int):
+        self._append(channel_id, {'op': 'delete', 'id': message_id})
+
+    def _records(self, channel_id: int) -> Iterator[dict]:
+        try:
+            f = open(self.path(channel_id), 'r', encoding='utf-8')
+        except FileNotFoundError:
+            return
+        with f:
+            for raw in f:
+                if not raw.endswith("\n"):
+                    # Record still being appended
+                    break
+                try:
+                    yield json.loads(raw)
+                except json.JSONDecodeError:
+                    # Torn line after a crash
+                    logger.warning(f"Skipping corrupt transcript log record for channel {channel_id}")
+
+    def last_id(self, channel_id: int) -> Optional[int]:
+        """Newest message ID captured for a ticket (None if nothing is logged).
+
+        Records up to this ID are only guaranteed to be on disk after flush().
+        """
+        return self.last_ids.get(channel_id) or None
+
+    def entries(self, channel_id: int, up_to: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Yield the transcript entries in message order with edits and deletions applied.
+
+        Messages newer than up_to are left out, so a caller can fetch exactly
+        that tail from the channel history.
+
+        Only edited and deleted message IDs are held in memory; the log itself
+        is streamed twice. Blocking; call from a worker thread.
+        """
+        edits: Dict[int, Dict[str, Any]] = {}
+        deleted = set()
+        for record in self._records(channel_id):
+            if record.get('op') == 'edit':
+                edits[record['id']] = record['entry']
+            elif record.get('op') == 'delete':
+                deleted.add(record['id'])
+
+        seen = set()
+        for record in self._records(channel_id):
+            message_id = record.get('id')
+            if record.get('op') != 'create' or message_id in deleted or message_id in seen:
+                continue
+            if up_to is not None and message_id > up_to:
+                continue
+            seen.add(message_id)
+            yield edits.get(message_id, record['entry'])
+
+    async def discard(self, channel_id: int):
+        """Remove a closed ticket's log"""
+        self.last_ids.pop(channel_id, None)
+        self.active.discard(channel_id)
+        self._pending.pop(channel_id, None)
+        # Let a write already in flight finish so it can't recreate the file
+        await self._writer.flush()
+        try:
+            await asyncio.to_thread(os.remove, self.path(channel_id))
+        except FileNotFoundError:
+            pass
+
+# Shared instance used by the ticket views and cog
+transcript_log = TranscriptLog()
@@ -0,0 +1,214 @@
+import gzip
+import html
+import json
+import shutil
+import tempfile
+import zipfile
+from datetime import datetime, timezone
+from typing import IO, Any, Dict, Iterable, Tuple
+import discord
+
+# Transcripts up to this size stay in memory, bigger ones are spooled to disk
+TRANSCRIPT_SPOOL_SIZE = 1024 * 1024
+
+TRANSCRIPT_FORMATS = ('txt', 'html')
+TRANSCRIPT_COMPRESSIONS = ('none', 'gzip', 'zip')
+
+def spooled_file() -> IO[bytes]:
+    return tempfile.SpooledTemporaryFile(max_size=TRANSCRIPT_SPOOL_SIZE)
+
+def message_to_entry(message: discord.Message) -> Dict[str, Any]:
+    """Capture what a transcript needs from a message as a JSON-serializable dict"""
+    return {
+        'id': message.id,
+        'created_at': message.created_at.timestamp(),
+        'author': message.author.display_name,
+        'author_tag': f"{message.author.name}#{message.author.discriminator}",
+        'avatar_url': message.author.display_avatar.url,
+        'content': message.content,
+        'embeds': [
+            {
+                'title': embed.title,
+                'description': embed.description,
+                'url': embed.url,
+                'color': embed.color.value if embed.color else None,
+                'fields': [(field.name, field.value) for field in embed.fields],
+            }
+            for embed in message.embeds
+        ],
+        'attachments': [
+            {'filename': attachment.filename, 'url': attachment.url}
+            for attachment in message.attachments
+        ],
+    }
+
+def _timestamp(value: float) -> str:
+    return datetime.fromtimestamp(value, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+class TextTranscriptWriter:
+    """Plain-text transcript, one message per line block"""
+
+    extension = 'txt'
+
+    def __init__(self, fp: IO[bytes]):
+        self.fp = fp
+        self.separator = b""
+
+    def header(self, meta: Dict[str, str]):
+        header = (
+            f"Transcript del Ticket: {meta['channel']}\n"
+            f"Usuario: {meta['user']}\n"
+            f"Creado: {meta['created']}\n"
+            f"Cerrado: {meta['closed']}\n"
+            + "=" * 50 + "\n\n"
+        )
+        self.fp.write(header.encode('utf-8'))
+
+    def entry(self, entry: Dict[str, Any]):
+        content = entry['content'] or "[No content]"
+        for embed in entry['embeds']:
+            if embed['title']:
+                content += f"\n[Embed: {embed['title']}]"
+            if embed['description']:
+                content += f"\n{embed['description']}"
+        for attachment in entry['attachments']:
+            content += f"\n[Attachment: {attachment['filename']}]"
+        line = f"[{_timestamp(entry['created_at'])}] {entry['author']} ({entry['author_tag']}): {content}"
+        self.fp.write(self.separator + line.encode('utf-8'))
+        self.separator = b"\n"
+
+    def footer(self):
+        pass
+
+HTML_HEAD = """<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ background: #313338; color: #dbdee1; font-family: "gg sans", "Helvetica Neue", Arial, sans-serif; margin: 0; padding: 24px; }}
+header {{ border-bottom: 1px solid #4e5058; margin-bottom: 16px; padding-bottom: 12px; }}
+h1 {{ color: #f2f3f5; font-size: 20px; margin: 0 0 8px; }}
+.meta {{ color: #949ba4; font-size: 14px; }}
+.message {{ display: flex; gap: 12px; padding: 6px 0; }}
+.avatar {{ border-radius: 50%; height: 40px; width: 40px; }}
+.author {{ color: #f2f3f5; font-weight: 600; }}
+.tag, .time {{ color: #949ba4; font-size: 12px; margin-left: 6px; }}
+.content {{ white-space: pre-wrap; word-wrap: break-word; }}
+.embed {{ background: #2b2d31; border-left: 4px solid #1e1f22; border-radius: 4px; margin-top: 4px; max-width: 520px; padding: 8px 12px; }}
+.embed-title {{ color: #f2f3f5; font-weight: 600; }}
+.embed-field-name {{ color: #f2f3f5; font-size: 14px; font-weight: 600; margin-top: 6px; }}
+.attachment a, .embed a {{ color: #00a8fc; }}
+</style>
+</head>
+<body>
+"""
+
+class HtmlTranscriptWriter:
+    """Self-contained HTML transcript with embeds and attachment links"""
+
+    extension = 'html'
+
+    def __init__(self, fp: IO[bytes]):
+        self.fp = fp
+
+    def write(self, text: str):
+        self.fp.write(text.encode('utf-8'))
+
+    def header(self, meta: Dict[str, str]):
+        e = html.escape
+        self.write(HTML_HEAD.format(title=e(f"Transcript - {meta['channel']}")))
+        self.write(
+            f"<header><h1>Transcript del Ticket: {e(meta['channel'])}</h1>"
+            f"<div class=\"meta\">Usuario: {e(meta['user'])} · Creado: {e(meta['created'])} · "
+            f"Cerrado: {e(meta['closed'])}</div></header>\n<main>\n"
+        )
+
+    def entry(self, entry: Dict[str, Any]):
+        e = html.escape
+        parts = [
+            f"<div class=\"message\" id=\"m{entry['id']}\">",
+            f"<img class=\"avatar\" src=\"{e(entry['avatar_url'])}\" alt=\"\">",
+            "<div>",
+            f"<span class=\"author\">{e(entry['author'])}</span>",
+            f"<span class=\"tag\">{e(entry['author_tag'])}</span>",
+            f"<span class=\"time\">{_timestamp(entry['created_at'])}</span>",
+        ]
+        if entry['content']:
+            parts.append(f"<div class=\"content\">{e(entry['content'])}</div>")
+        for embed in entry['embeds']:
+            color = f"#{embed['color']:06x}" if embed['color'] is not None else "#1e1f22"
+            parts.append(f"<div class=\"embed\" style=\"border-left-color: {color}\">")
+            if embed['title']:
+                title = e(embed['title'])
+                if embed['url']:
+                    title = f"<a href=\"{e(embed['url'])}\">{title}</a>"
+                parts.append(f"<div class=\"embed-title\">{title}</div>")
+            if embed['description']:
+                parts.append(f"<div class=\"content\">{e(embed['description'])}</div>")
+            for name, value in embed['fields']:
+                parts.append(f"<div class=\"embed-field-name\">{e(name)}</div><div class=\"content\">{e(value)}</div>")
+            parts.append("</div>")
+        for attachment in entry['attachments']:
+            parts.append(
+                f"<div class=\"attachment\">📎 <a href=\"{e(attachment['url'])}\">{e(attachment['filename'])}</a></div>"
+            )
+        parts.append("</div></div>\n")
+        self.write("".join(parts))
+
+    def footer(self):
+        self.write("</main>\n</body>\n</html>\n")
+
+WRITERS = {writer.extension: writer for writer in (TextTranscriptWriter, HtmlTranscriptWriter)}
+
+def read_entries(fp: IO[bytes]) -> Iterable[Dict[str, Any]]:
+    """Read entries spooled as JSON lines"""
+    fp.seek(0)
+    for raw in fp:
+        yield json.loads(raw)
+
+def render_transcript(meta: Dict[str, str], sources: Iterable[Iterable[Dict[str, Any]]],
+                      fmt: str = 'txt', compression: str = 'none',
+                      filename: str = 'transcript') -> Tuple[IO[bytes], str]:
+    """Render entries into a spooled file, optionally compressed.
+
+    Blocking; run it in a worker thread. Returns the file (positioned at the
+    start, to be closed by the caller) and its upload filename.
+    """
+    output = spooled_file()
+    try:
+        writer = WRITERS.get(fmt, TextTranscriptWriter)(output)
+        writer.header(meta)
+        for source in sources:
+            for entry in source:
+                writer.entry(entry)
+        writer.footer()
+        filename = f"{filename}.{writer.extension}"
+        output.seek(0)
+        return compress(output, filename, compression)
+    except BaseException:
+        output.close()
+        raise
+
+def compress(fp: IO[bytes], filename: str, compression: str) -> Tuple[IO[bytes], str]:
+    """Compress a rendered transcript with gzip or zip, closing the uncompressed file"""
+    if compression not in ('gzip', 'zip'):
+        return fp, filename
+
+    compressed = spooled_file()
+    try:
+        with fp:
+            if compression == 'gzip':
+                with gzip.GzipFile(filename=filename, mode='wb', fileobj=compressed) as archive:
+                    shutil.copyfileobj(fp, archive)
+                filename += '.gz'
+            else:
+                with zipfile.ZipFile(compressed, 'w', zipfile.ZIP_DEFLATED) as archive:
+                    with archive.open(filename, 'w') as member:
+                        shutil.copyfileobj(fp, member)
+                filename = filename.rsplit('.', 1)[0] + '.zip'
+        compressed.seek(0)
+        return compressed, filename
+    except BaseException:
+        compressed.close()
+        raise